@@ -9,17 +9,31 @@ Requirements:
 
 import os
 import sys
+import shutil
 import subprocess
 import tempfile
-from pathlib import Path
+import wave
+import functools
 
-# Import pydub for audio processing
-try:
-    from pydub import AudioSegment
-    PYDUB_AVAILABLE = True
-except ImportError:
-    # We keep this try/except since pydub is optional with ffmpeg fallback
-    PYDUB_AVAILABLE = False
+# Read size for piping decoded PCM out of FFmpeg
+STREAM_CHUNK_SIZE = 1 << 16
+
+# Common FFmpeg arguments: no banner or progress output, only errors on stderr,
+# never read the terminal, and overwrite outputs instead of prompting
+FFMPEG_COMMAND = ['ffmpeg', '-hide_banner', '-nostats', '-loglevel', 'error', '-nostdin', '-y']
+
+# Short speech clips decode faster on one thread than with thread sync overhead
+FFMPEG_INPUT_ARGS = ['-threads', '1']
+
+@functools.lru_cache(maxsize=1)
+def ffmpeg_available():
+    """
+    Check once per process whether FFmpeg is on the PATH
+    
+    Returns:
+        bool: True if FFmpeg is installed, False otherwise
+    """
+    return shutil.which('ffmpeg') is not None
 
 def check_ffmpeg(quiet=False):
     """
@@ -31,15 +45,27 @@ def check_ffmpeg(quiet=False):
     Returns:
         bool: True if FFmpeg is installed, False otherwise
     """
-    try:
-        subprocess.run(['ffmpeg', '-version'], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+    if ffmpeg_available():
         if not quiet:
             print("✓ FFmpeg is installed")
         return True
-    except (subprocess.SubprocessError, FileNotFoundError):
-        if not quiet:
-            print("✗ FFmpeg is not installed")
-        return False
+    if not quiet:
+        print("✗ FFmpeg is not installed")
+    return False
+
+def get_converted_path(input_file):
+    """
+    Build the default output path for a converted file
+    
+    Args:
+        input_file (str): Path to the input audio file
+        
+    Returns:
+        str: Path with a -converted.wav suffix in the same directory as the input
+    """
+    # Extract the base filename without extension
+    base_name = os.path.splitext(os.path.basename(input_file))[0]
+    return os.path.join(os.path.dirname(input_file), f"{base_name}-converted.wav")
 
 def convert_to_wav(input_file, output_file=None, quiet=False):
     """
@@ -48,7 +74,7 @@ def convert_to_wav(input_file, output_file=None, quiet=False):
     Args:
         input_file (str): Path to the input audio file
         output_file (str, optional): Path to save the output WAV file.
-                                    If not provided, a temp file will be created.
+                                    If not provided, a file named after the input will be created.
         quiet (bool): Whether to suppress console output
         
     Returns:
@@ -59,50 +85,97 @@ def convert_to_wav(input_file, output_file=None, quiet=False):
             print(f"Input file not found: {input_file}")
         return False, None
     
-    # Get the file extension
-    file_extension = Path(input_file).suffix.lower()
+    # Get the file name and extension with plain string ops, no Path objects
+    base_name = os.path.basename(input_file)
+    file_extension = os.path.splitext(base_name)[1].lower()
+    
+    # Probe the audio stream once to see whether any work is needed
+    stream = probe_audio_stream(input_file)
     
-    # If already a WAV file, return the path
-    if file_extension == '.wav':
+    # If already a WAV file in the target format, return the path.
+    # Without FFprobe we can't tell, so trust the extension
+    if file_extension == '.wav' and is_target_format(stream, default=True):
         return True, input_file
     
     # If output_file is not specified, create a name based on the input file
     if not output_file:
-        # Extract the base filename without extension
-        base_name = os.path.splitext(os.path.basename(input_file))[0]
-        # Create output path with -converted.wav suffix in the same directory as input
-        output_file = os.path.join(os.path.dirname(input_file), f"{base_name}-converted.wav")
+        output_file = get_converted_path(input_file)
     
+    if not quiet:
+        print(f"Converting {base_name} to WAV format.. {output_file}.")
     
+    return convert_to_wav_with_ffmpeg(input_file, output_file, quiet, remux=is_target_format(stream))
+
+def open_pcm_stream(input_file, stderr=subprocess.PIPE):
+    """
+    Start an FFmpeg process that decodes an audio file to raw PCM on stdout
+    
+    Args:
+        input_file (str): Path to the input audio file
+        stderr: Where FFmpeg writes errors. Pass a file when reading stdout
+                incrementally: a pipe that is only read after stdout ends can
+                fill up and leave both processes waiting on each other
+        
+    Returns:
+        subprocess.Popen: Process whose stdout yields 16-bit PCM, 16kHz, mono
+    """
+    return subprocess.Popen(FFMPEG_COMMAND + FFMPEG_INPUT_ARGS + [
+        '-i', input_file,
+        '-f', 's16le',
+        '-ac', '1',
+        '-ar', '16000',
+        '-'
+    ], stdout=subprocess.PIPE, stderr=stderr)
+
+def convert_to_wav_streaming(input_file, output_file, quiet=False):
+    """
+    Convert an audio file to WAV format by piping FFmpeg output into the WAV writer
+    
+    Args:
+        input_file (str): Path to the input audio file
+        output_file (str): Path to save the output WAV file
+        quiet (bool): Whether to suppress console output
+        
+    Returns:
+        tuple: (success (bool), output_file_path (str))
+        
+    Raises:
+        OSError: If FFmpeg can't be started or the output file can't be written
+        subprocess.CalledProcessError: If FFmpeg fails to decode the input
+    """
     if not quiet:
-        print(f"Converting {os.path.basename(input_file)} to WAV format.. {output_file}.")
+        print("Streaming conversion through FFmpeg...")
     
-    # Try with pydub if available
-    if PYDUB_AVAILABLE:
+    with tempfile.TemporaryFile() as error_log:
+        process = open_pcm_stream(input_file, stderr=error_log)
         try:
-            if not quiet:
-                print("Using pydub for conversion...")
-            audio = AudioSegment.from_file(input_file)
-            audio = audio.set_frame_rate(16000).set_channels(1).set_sample_width(2)
-            audio.export(output_file, format="wav")
-            if not quiet:
-                print(f"✓ Conversion successful: {os.path.basename(output_file)}")
-                print(f"  - Duration: {len(audio)/1000:.2f} seconds")
-                print(f"  - Channels: {audio.channels}")
-                print(f"  - Sample rate: {audio.frame_rate} Hz")
-                print(f"  - Sample width: {audio.sample_width} bytes")
-            return True, output_file
-        except Exception as e:
-            if not quiet:
-                print(f"⚠️ Pydub conversion failed: {e}")
-                print("Falling back to FFmpeg...")
-            # If pydub failed, try FFmpeg if available
-            return convert_to_wav_with_ffmpeg(input_file, output_file, quiet)
-    else:
-        # If pydub is not available, try FFmpeg
-        return convert_to_wav_with_ffmpeg(input_file, output_file, quiet)
+            # Open the file first: wave.open on a path that can't be created
+            # leaves a half-built writer that errors again when collected
+            with open(output_file, 'wb') as output, wave.open(output, 'wb') as wav:
+                wav.setparams((1, 2, 16000, 0, 'NONE', 'not compressed'))
+                for chunk in iter(lambda: process.stdout.read(STREAM_CHUNK_SIZE), b''):
+                    wav.writeframesraw(chunk)
+                frames = wav.getnframes()
+        finally:
+            process.stdout.close()
+            returncode = process.wait()
+        error_log.seek(0)
+        stderr = error_log.read()
+    
+    if returncode != 0:
+        if os.path.exists(output_file):
+            os.remove(output_file)
+        raise subprocess.CalledProcessError(returncode, process.args, stderr=stderr)
+    
+    if not quiet:
+        print(f"✓ Conversion successful: {os.path.basename(output_file)}")
+        print(f"  - Duration: {frames / 16000:.2f} seconds")
+        print("  - Channels: 1")
+        print("  - Sample rate: 16000 Hz")
+        print("  - Sample width: 2 bytes")
+    return True, output_file
 
-def convert_to_wav_with_ffmpeg(input_file, output_file, quiet=False):
+def convert_to_wav_with_ffmpeg(input_file, output_file, quiet=False, remux=False):
     """
     Convert an audio file to WAV format using FFmpeg
     
@@ -110,6 +183,8 @@ def convert_to_wav_with_ffmpeg(input_file, output_file, quiet=False):
         input_file (str): Path to the input audio file
         output_file (str): Path to save the output WAV file
         quiet (bool): Whether to suppress console output
+        remux (bool): Copy the audio stream as-is when it is already
+                      16-bit PCM, 16kHz, mono and only the container differs
         
     Returns:
         tuple: (success (bool), output_file_path (str))
@@ -124,47 +199,70 @@ def convert_to_wav_with_ffmpeg(input_file, output_file, quiet=False):
         return False, None
     
     try:
+        if not remux:
+            # Stream decoded samples straight into the WAV file
+            return convert_to_wav_streaming(input_file, output_file, quiet)
+        
         if not quiet:
             print("Using FFmpeg for conversion...")
         
-        # Use FFmpeg to convert to WAV format (16-bit PCM, 16kHz)
-        subprocess.run([
-            'ffmpeg',
-            '-i', input_file,
-            '-acodec', 'pcm_s16le',
-            '-ac', '1',
-            '-ar', '16000',
-            output_file
-        ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+        # Only the container differs, so copy the samples instead of re-encoding
+        subprocess.run(FFMPEG_COMMAND + FFMPEG_INPUT_ARGS + ['-i', input_file, '-c:a', 'copy', output_file],
+                       stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
         
         if not quiet:
             print(f"✓ Conversion successful: {os.path.basename(output_file)}")
             
-            # Get information about the converted file
-            try:
-                info = subprocess.run([
-                    'ffprobe',
-                    '-v', 'error',
-                    '-select_streams', 'a:0',
-                    '-show_entries', 'stream=duration,channels,sample_rate,bits_per_sample',
-                    '-of', 'default=noprint_wrappers=1:nokey=0',
-                    output_file
-                ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
-                print(info.stdout.decode('utf-8'))
-            except:
-                pass
+            # Remuxing only happens for 16-bit PCM, 16kHz, mono input,
+            # so the output format is known without probing it again
+            print("  - Channels: 1")
+            print("  - Sample rate: 16000 Hz")
+            print("  - Sample width: 2 bytes")
         
         return True, output_file
-    except subprocess.CalledProcessError as e:
+    except (subprocess.CalledProcessError, wave.Error, OSError) as e:
+        # OSError covers an output file that can't be written, e.g. next to
+        # an input in a read-only directory
         if not quiet:
             print(f"✗ FFmpeg conversion failed: {e}")
         if os.path.exists(output_file):
             os.remove(output_file)
         return False, None
 
+def get_wav_info(audio_file):
+    """
+    Get information about a PCM WAV file by reading its header
+    
+    Args:
+        audio_file (str): Path to the WAV file
+        
+    Returns:
+        dict: Audio file information in the same shape as FFprobe's JSON output
+        
+    Raises:
+        wave.Error: If the file isn't a PCM WAV file the wave module can read
+    """
+    with wave.open(audio_file, 'rb') as wav:
+        sample_rate = wav.getframerate()
+        sample_width = wav.getsampwidth()
+        frames = wav.getnframes()
+        channels = wav.getnchannels()
+    
+    codec_name = 'pcm_u8' if sample_width == 1 else f'pcm_s{sample_width * 8}le'
+    return {
+        'streams': [{
+            'codec_name': codec_name,
+            'sample_rate': str(sample_rate),
+            'channels': channels,
+            'bits_per_sample': sample_width * 8,
+            'duration': f"{frames / sample_rate:.6f}" if sample_rate else "0"
+        }]
+    }
+
 def get_audio_info(audio_file, quiet=False):
     """
-    Get information about an audio file using FFmpeg
+    Get information about an audio file, reading WAV headers directly
+    and using FFmpeg for other formats
     
     Args:
         audio_file (str): Path to the audio file
@@ -173,6 +271,14 @@ def get_audio_info(audio_file, quiet=False):
     Returns:
         dict: Audio file information or None if error
     """
+    # The header of a PCM WAV file has everything we need, no subprocess required
+    if os.path.splitext(audio_file)[1].lower() == '.wav':
+        try:
+            return get_wav_info(audio_file)
+        except (wave.Error, EOFError, OSError):
+            # Compressed or unusual WAV, let FFprobe have a look
+            pass
+    
     if not check_ffmpeg(True):
         return None
     
@@ -181,7 +287,7 @@ def get_audio_info(audio_file, quiet=False):
             'ffprobe',
             '-v', 'error',
             '-select_streams', 'a:0',
-            '-show_entries', 'stream=duration,channels,sample_rate,bits_per_sample',
+            '-show_entries', 'stream=codec_name,duration,channels,sample_rate,bits_per_sample',
             '-of', 'json',
             audio_file
         ], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
@@ -194,6 +300,63 @@ def get_audio_info(audio_file, quiet=False):
             print(f"Error getting audio info: {e}")
         return None
 
+def probe_audio_stream(audio_file):
+    """
+    Get the first audio stream of a file
+    
+    Args:
+        audio_file (str): Path to the audio file
+        
+    Returns:
+        dict: Stream information as reported by get_audio_info, or None if unavailable
+    """
+    info = get_audio_info(audio_file, quiet=True)
+    streams = info.get('streams') if info else None
+    return streams[0] if streams else None
+
+def is_target_format(stream, default=False):
+    """
+    Check whether an audio stream is already 16-bit PCM, 16kHz, mono
+    
+    Args:
+        stream (dict): Stream information from probe_audio_stream
+        default (bool): Value to return when the stream couldn't be probed
+        
+    Returns:
+        bool: True if the stream needs no re-encoding
+    """
+    if stream is None:
+        return default
+    try:
+        return (stream.get('codec_name') == 'pcm_s16le'
+                and int(stream.get('sample_rate', 0)) == 16000
+                and int(stream.get('channels', 0)) == 1
+                and int(stream.get('bits_per_sample', 0)) == 16)
+    except (TypeError, ValueError):
+        return False
+
+def is_speech_ready_wav(audio_file, sample_rates=(16000, 8000)):
+    """
+    Check whether a file is already a mono 16-bit PCM WAV that Azure Speech
+    accepts without conversion. Only the header is read
+    
+    Args:
+        audio_file (str): Path to the audio file
+        sample_rates (tuple): Accepted sample rates in Hz
+        
+    Returns:
+        bool: True if the file can be used as-is
+    """
+    try:
+        with wave.open(audio_file, 'rb') as wav:
+            return (wav.getnchannels() == 1
+                    and wav.getsampwidth() == 2
+                    and wav.getframerate() in sample_rates
+                    and wav.getcomptype() == 'NONE')
+    except (wave.Error, EOFError, OSError):
+        # Not a WAV file (or not one the wave module can read)
+        return False
+
 def convert_files_to_wav(file_list, quiet=False):
     """
     Convert multiple files to WAV format
@@ -235,12 +398,6 @@ def main():
         print("\nAudio Conversion")
         print("===============")
         
-        # Check for pydub
-        if PYDUB_AVAILABLE:
-            print("pydub library: Available")
-        else:
-            print("pydub library: Not installed (you can install with 'pip install pydub')")
-        
         # Check for FFmpeg
         check_ffmpeg()
     
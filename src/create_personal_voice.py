@@ -15,12 +15,24 @@ import os
 import sys
 import json
 import argparse
+import contextlib
 import requests
 import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from dotenv import load_dotenv
-from audio_conversion import convert_to_wav, convert_files_to_wav
+from audio_conversion import convert_to_wav
+
+# Import requests_toolbelt to stream multipart uploads
+try:
+    from requests_toolbelt import MultipartEncoder
+    MULTIPART_ENCODER_AVAILABLE = True
+except ImportError:
+    # Optional, requests buffers the whole multipart body without it
+    MULTIPART_ENCODER_AVAILABLE = False
 
 # Load environment variables from .env file
 env_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
@@ -44,25 +56,46 @@ if not SPEECH_KEY or not SPEECH_REGION:
 # API version
 API_VERSION = "2024-02-01-preview"
 
+# Base URL for the Custom Voice API, the region doesn't change at runtime
+BASE_URL = f"https://{SPEECH_REGION}.api.cognitive.microsoft.com/customvoice"
+
+# Read buffer for upload files. The HTTP client pulls the body in 8 KiB
+# blocks, so a large buffer turns those into far fewer read syscalls
+UPLOAD_BUFFER_SIZE = 1 << 20
+
+# Upper bound on concurrent audio conversions
+MAX_CONVERSION_WORKERS = 8
+
+# Shared HTTP session so every API call reuses the same keep-alive connection
+SESSION = requests.Session()
+if SPEECH_KEY:
+    SESSION.headers.update({"Ocp-Apim-Subscription-Key": SPEECH_KEY})
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=10,
+                                      max_retries=Retry(total=3, backoff_factor=0.3)))
+
+def post_multipart(url, data, files):
+    """
+    POST a multipart form, streaming file parts from disk when possible
+    """
+    if MULTIPART_ENCODER_AVAILABLE:
+        encoder = MultipartEncoder(fields=list(data.items()) + files)
+        return SESSION.post(url, data=encoder, headers={"Content-Type": encoder.content_type})
+    return SESSION.post(url, files=files, data=data)
+
 def create_project(project_id, description="Personal Voice Project"):
     """
     Create a new personal voice project
     """
     print(f"\n[1/4] Creating project '{project_id}'...")
     
-    url = f"https://{SPEECH_REGION}.api.cognitive.microsoft.com/customvoice/projects/{project_id}?api-version={API_VERSION}"
-    
-    headers = {
-        "Ocp-Apim-Subscription-Key": SPEECH_KEY,
-        "Content-Type": "application/json"
-    }
+    url = f"{BASE_URL}/projects/{project_id}?api-version={API_VERSION}"
     
     data = {
         "description": description,
         "kind": "PersonalVoice"
     }
     
-    response = requests.put(url, headers=headers, json=data)
+    response = SESSION.put(url, json=data)
     
     if response.status_code in [200, 201]:
         print(f"✓ Project created successfully: {project_id}")
@@ -78,21 +111,7 @@ def upload_consent(project_id, consent_id, consent_file_path, voice_talent_name,
     """
     print(f"\n[2/4] Uploading consent for '{voice_talent_name}'... from file '{consent_file_path}'")
     
-    url = f"https://{SPEECH_REGION}.api.cognitive.microsoft.com/customvoice/consents/{consent_id}?api-version={API_VERSION}"
-    
-    headers = {
-        "Ocp-Apim-Subscription-Key": SPEECH_KEY,
-    }
-    
-    # Ensure the consent file exists
-    if not os.path.exists(consent_file_path):
-        print(f"✗ Consent file not found: {consent_file_path}")
-        return False, None
-    
-    # Create multipart form data
-    files = {
-        'audiodata': (os.path.basename(consent_file_path), open(consent_file_path, 'rb'), 'audio/wav')
-    }
+    url = f"{BASE_URL}/consents/{consent_id}?api-version={API_VERSION}"
     
     data = {
         'description': f"Consent for {voice_talent_name}",
@@ -102,7 +121,19 @@ def upload_consent(project_id, consent_id, consent_file_path, voice_talent_name,
         'locale': locale
     }
     
-    response = requests.post(url, headers=headers, files=files, data=data)
+    # Open the consent file directly, a missing file fails here without a separate stat
+    try:
+        consent_file = open(consent_file_path, 'rb', buffering=UPLOAD_BUFFER_SIZE)
+    except FileNotFoundError:
+        print(f"✗ Consent file not found: {consent_file_path}")
+        return False, None
+    
+    # Create multipart form data, closing the file once the upload is done
+    with consent_file:
+        files = [
+            ('audiodata', (os.path.basename(consent_file_path), consent_file, 'audio/wav'))
+        ]
+        response = post_multipart(url, data, files)
     
     if response.status_code in [200, 201, 202]:
         print(f"✓ Consent uploaded successfully: {consent_id}")
@@ -130,20 +161,19 @@ def upload_consent(project_id, consent_id, consent_file_path, voice_talent_name,
         print(response.text)
         return False, None
 
-def monitor_operation(operation_id, max_attempts=10, delay=5):
+def monitor_operation(operation_id, max_attempts=10, delay=0.5, max_delay=30):
     """
     Monitor an asynchronous operation
+    
+    Polls with exponential backoff starting at `delay` seconds and capped at
+    `max_delay`, honoring the service's Retry-After header when present.
     """
     print(f"Monitoring operation {operation_id}...")
     
-    url = f"https://{SPEECH_REGION}.api.cognitive.microsoft.com/customvoice/operations/{operation_id}?api-version={API_VERSION}"
-    
-    headers = {
-        "Ocp-Apim-Subscription-Key": SPEECH_KEY
-    }
+    url = f"{BASE_URL}/operations/{operation_id}?api-version={API_VERSION}"
     
     for attempt in range(max_attempts):
-        response = requests.get(url, headers=headers)
+        response = SESSION.get(url)
         print(f"Attempt {attempt+1}/{max_attempts}... status code: {response.status_code}")
 
         if response.status_code == 200:
@@ -163,41 +193,52 @@ def monitor_operation(operation_id, max_attempts=10, delay=5):
                 return False, operation_status
             else:
                 print(f"Operation in progress: {status} (attempt {attempt+1}/{max_attempts})")
-                time.sleep(delay)
-                continue
+        
+        if attempt + 1 < max_attempts:
+            time.sleep(get_poll_delay(response, delay, max_delay))
+            delay = min(delay * 1.8, max_delay)
                 
     print(f"✗ Timed out waiting for operation to complete")
     return False, None
 
+def get_poll_delay(response, delay, max_delay):
+    """
+    Get how long to wait before polling again, preferring the Retry-After header
+    """
+    retry_after = response.headers.get('Retry-After')
+    if retry_after:
+        try:
+            return min(float(retry_after), max_delay)
+        except ValueError:
+            pass
+    return min(delay, max_delay)
+
 def create_personal_voice(project_id, consent_id, voice_id, sample_files):
     """
     Create a personal voice using sample files
     """
     print(f"\n[3/4] Creating personal voice '{voice_id}' with {len(sample_files)} sample(s)...")
     
-    url = f"https://{SPEECH_REGION}.api.cognitive.microsoft.com/customvoice/personalvoices/{voice_id}?api-version={API_VERSION}"
-    
-    headers = {
-        "Ocp-Apim-Subscription-Key": SPEECH_KEY
-    }
-    
-    # Verify sample files exist
-    for sample_file in sample_files:
-        if not os.path.exists(sample_file):
-            print(f"✗ Sample file not found: {sample_file}")
-            return False, None
-    
-    # Create multipart form data
-    files = []
-    for sample_file in sample_files:
-        files.append(('audiodata', (os.path.basename(sample_file), open(sample_file, 'rb'), 'audio/wav')))
+    url = f"{BASE_URL}/personalvoices/{voice_id}?api-version={API_VERSION}"
     
     data = {
         'projectId': project_id,
         'consentId': consent_id
     }
     
-    response = requests.post(url, headers=headers, files=files, data=data)
+    # Create multipart form data, closing every file once the upload is done
+    with contextlib.ExitStack() as stack:
+        files = []
+        for sample_file in sample_files:
+            # Opening doubles as the existence check, so each file is only touched once
+            try:
+                handle = stack.enter_context(open(sample_file, 'rb', buffering=UPLOAD_BUFFER_SIZE))
+            except FileNotFoundError:
+                print(f"✗ Sample file not found: {sample_file}")
+                return False, None
+            files.append(('audiodata', (os.path.basename(sample_file), handle, 'audio/wav')))
+        
+        response = post_multipart(url, data, files)
     
     if response.status_code in [200, 201, 202]:
         result = response.json()
@@ -221,13 +262,9 @@ def get_voice_status(voice_id):
     """
     print(f"\n[4/4] Checking status of voice '{voice_id}'...")
     
-    url = f"https://{SPEECH_REGION}.api.cognitive.microsoft.com/customvoice/personalvoices/{voice_id}?api-version={API_VERSION}"
-    
-    headers = {
-        "Ocp-Apim-Subscription-Key": SPEECH_KEY
-    }
+    url = f"{BASE_URL}/personalvoices/{voice_id}?api-version={API_VERSION}"
     
-    response = requests.get(url, headers=headers)
+    response = SESSION.get(url)
     
     if response.status_code == 200:
         result = response.json()
@@ -243,6 +280,14 @@ def get_voice_status(voice_id):
         print(response.text)
         return False, None
 
+def format_azure_timestamp(value):
+    """
+    Format an Azure UTC timestamp (e.g. 2025-06-18T22:23:57.123Z) as 'YYYY-MM-DD HH:MM:SS UTC'
+    """
+    if len(value) >= 19 and value[10] == 'T':
+        return f"{value[:10]} {value[11:19]} UTC"
+    return value
+
 def display_voice_details(voice_details):
     """
     Display the details of a personal voice in a formatted way
@@ -268,20 +313,10 @@ def display_voice_details(voice_details):
     last_action_date = voice_details.get('lastActionDateTime')
     
     if created_date:
-        created_date = created_date.replace('Z', '+00:00')
-        try:
-            dt = datetime.fromisoformat(created_date)
-            print(f"Created:            {dt.strftime('%Y-%m-%d %H:%M:%S')} UTC")
-        except:
-            print(f"Created:            {created_date}")
+        print(f"Created:            {format_azure_timestamp(created_date)}")
             
     if last_action_date:
-        last_action_date = last_action_date.replace('Z', '+00:00')
-        try:
-            dt = datetime.fromisoformat(last_action_date)
-            print(f"Last Action:        {dt.strftime('%Y-%m-%d %H:%M:%S')} UTC")
-        except:
-            print(f"Last Action:        {last_action_date}")
+        print(f"Last Action:        {format_azure_timestamp(last_action_date)}")
     
     print("="*60)
     print(f"\nTo use this voice in text-to-speech applications, use the Speaker Profile ID:")
@@ -331,37 +366,63 @@ def main():
         print("Error: Please provide at least 2 sample audio files")
         sys.exit(1)
     
-    # Convert audio files if needed
-    print("\nChecking audio file formats...")
-    
-    # Convert consent file if needed
-    converted_consent_file = convert_to_wav(args.consent)[1]
+    audio_files = [args.consent] + args.samples
+    conversion_workers = min(MAX_CONVERSION_WORKERS, len(audio_files))
     
-    # Convert sample files if needed
-    converted_sample_files = []
-    temp_files = []
-    
-    for sample_file in args.samples:
-        converted_file = convert_to_wav(sample_file)[1]
-        converted_sample_files.append(converted_file)
-
+    # One extra worker for the project request
+    with ThreadPoolExecutor(max_workers=conversion_workers + 1) as executor:
+        # Project creation doesn't depend on the audio files, so let the
+        # request run while the files are converted
+        project_future = executor.submit(create_project, project_id)
+        
+        # Convert audio files if needed. Each conversion is its own FFmpeg
+        # process, so they can all run at once
+        print("\nChecking audio file formats...")
+        conversion_futures = [executor.submit(convert_to_wav, audio_file) for audio_file in audio_files]
+        
+        def abort():
+            # Drop queued conversions, so leaving the executor only waits
+            # for the ones already running
+            for future in conversion_futures:
+                future.cancel()
+            sys.exit(1)
+        
+        # Wait for the project to be created
+        project_success, project_details = project_future.result()
+        if not project_success:
+            abort()
+        
+        # The consent upload only needs the project and the consent file, so
+        # it goes out while the samples are still converting
+        converted_consent_file = conversion_futures[0].result()[1]
+        if converted_consent_file is None:
+            print(f"✗ Failed to convert audio file: {args.consent}")
+            abort()
+        
+        # Upload consent
+        consent_success, consent_details = upload_consent(
+            project_id, 
+            consent_id, 
+            converted_consent_file, 
+            args.name, 
+            args.company, 
+            args.locale
+        )
+        if not consent_success:
+            abort()
+        
+        converted_files = [future.result()[1] for future in conversion_futures]
     
-    # Create project
-    project_success, project_details = create_project(project_id)
-    if not project_success:
+    if None in converted_files:
+        for audio_file, converted_file in zip(audio_files, converted_files):
+            if converted_file is None:
+                print(f"✗ Failed to convert audio file: {audio_file}")
         sys.exit(1)
     
-    # Upload consent
-    consent_success, consent_details = upload_consent(
-        project_id, 
-        consent_id, 
-        converted_consent_file, 
-        args.name, 
-        args.company, 
-        args.locale
-    )
-    if not consent_success:
-        sys.exit(1)
+    converted_sample_files = converted_files[1:]
+    
+    # Only files produced by the conversion are temporary, never the originals
+    temp_files = [converted for original, converted in zip(audio_files, converted_files) if converted != original]
     
     # Create personal voice
     voice_success, voice_details = create_personal_voice(
@@ -382,7 +443,7 @@ def main():
     # Clean up temporary files if needed
     if args.delete_converted:
         print("\nCleaning up temporary files...")
-        for temp_file in [converted_consent_file] + converted_sample_files:
+        for temp_file in temp_files:
             if os.path.exists(temp_file):
                 os.remove(temp_file)
                 print(f"Deleted: {temp_file}")
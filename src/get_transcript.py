@@ -14,11 +14,27 @@ import argparse
 import tempfile
 import time
 import json
-from pathlib import Path
+import threading
+import asyncio
+import functools
+import hashlib
+import subprocess
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import requests
 from dotenv import load_dotenv
 import azure.cognitiveservices.speech as speechsdk
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
 # Import our audio conversion module
-from audio_conversion import convert_to_wav
+from audio_conversion import ffmpeg_available, is_speech_ready_wav, open_pcm_stream, probe_audio_stream
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    # Optional, the standard json module is used without it
+    ORJSON_AVAILABLE = False
 
 # Load environment variables from .env file
 env_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
@@ -41,8 +57,202 @@ if not SPEECH_KEY or not SPEECH_REGION:
     if not SPEECH_REGION:
         SPEECH_REGION = "eastus"
 
+# Recognition timeout used when the audio duration can't be determined
+DEFAULT_TIMEOUT_SECONDS = 300
+
+# Audio is sent to the recognizer as 16-bit PCM, 16kHz, mono
+SAMPLE_RATE = 16000
+
+# Bytes of PCM pushed to the recognizer at a time (one second of audio)
+PUSH_CHUNK_SIZE = 32000
+
+# Azure reports offsets and durations in 100-nanosecond ticks
+TICKS_PER_SECOND = 10000000
+TICKS_TO_MS = 1000 / TICKS_PER_SECOND
+TICKS_TO_SECONDS = 1 / TICKS_PER_SECOND
+
+# Continuous recognition runs at roughly real time, so the timeout is the
+# audio duration scaled by this factor plus a fixed margin
+TIMEOUT_DURATION_FACTOR = 1.5
+TIMEOUT_MARGIN_SECONDS = 60
+
+# Splitting on silence: each window is cut at the quietest frame between the
+# minimum and maximum window length, and windows are recognized in parallel
+SPLIT_MIN_WINDOW_SECONDS = 30
+SPLIT_MAX_WINDOW_SECONDS = 60
+SPLIT_FRAME_SECONDS = 0.03
+MAX_WINDOW_WORKERS = 10
+# Frames scored per step when computing frame energy, bounding the temporary memory
+ENERGY_BLOCK_FRAMES = 10000
+
+# Windows canceled with one of these errors are recognized again with backoff
+TRANSIENT_ERROR_CODES = (
+    speechsdk.CancellationErrorCode.TooManyRequests,
+    speechsdk.CancellationErrorCode.ConnectionFailure,
+    speechsdk.CancellationErrorCode.ServiceTimeout,
+    speechsdk.CancellationErrorCode.ServiceUnavailable,
+)
+MAX_ATTEMPTS = 5
+
+# Maximum number of files transcribed at once from the command line
+DEFAULT_CONCURRENCY = 5
+
+# Batch Transcription REST API (used for audio that is already hosted, e.g. a blob SAS URL)
+BATCH_API_URL = f"https://{SPEECH_REGION}.api.cognitive.microsoft.com/speechtotext/v3.1/transcriptions"
+BATCH_POLL_INTERVAL = 5
+# Give up on a batch job that has not finished after this long
+BATCH_MAX_WAIT_SECONDS = 2 * 60 * 60
+BATCH_PROFANITY_MODES = {"masked": "Masked", "removed": "Removed", "raw": "None"}
+
+# Transcripts of local files are cached here, keyed by audio content and options.
+# Set PERSONAL_VOICE_NO_CACHE=1 to always transcribe from scratch
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'personal-voice', 'transcripts')
+HASH_CHUNK_SIZE = 1 << 20
+
+# A recognized phrase; offset and duration are in 100-nanosecond ticks
+Segment = namedtuple('Segment', ['text', 'offset', 'duration'])
+
+class TransientRecognitionError(Exception):
+    """Recognition was canceled by an error that is worth retrying"""
+
+def get_recognition_timeout(audio_file_path):
+    """
+    Work out how long to wait for recognition of an audio file to finish
+    
+    Args:
+        audio_file_path (str): Path to the audio file being recognized
+        
+    Returns:
+        float: Timeout in seconds
+    """
+    stream = probe_audio_stream(audio_file_path)
+    try:
+        duration = float(stream['duration'])
+    except (TypeError, KeyError, ValueError):
+        return DEFAULT_TIMEOUT_SECONDS
+    return duration * TIMEOUT_DURATION_FACTOR + TIMEOUT_MARGIN_SECONDS
+
+def to_json(obj, indent=False):
+    """Serialize obj to a JSON string, using orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None).decode('utf-8')
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False)
+
+def from_json(text):
+    """Parse a JSON string, using orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(text)
+    return json.loads(text)
+
+def cache_enabled():
+    """Check whether the transcript cache is in use"""
+    return os.environ.get('PERSONAL_VOICE_NO_CACHE') != '1'
+
+def hash_audio_file(audio_file_path):
+    """
+    Compute the SHA-256 digest of an audio file for the transcript cache
+    
+    Args:
+        audio_file_path (str): Path to the audio file
+        
+    Returns:
+        str: Hex digest of the file contents, or None if it can't be read
+    """
+    try:
+        with open(audio_file_path, 'rb') as f:
+            if hasattr(hashlib, 'file_digest'):
+                # Python 3.11+: hashes through a reusable buffer without Python-side copies
+                audio_hash = hashlib.file_digest(f, 'sha256')
+            else:
+                audio_hash = hashlib.sha256()
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                    audio_hash.update(chunk)
+    except OSError as e:
+        print(f"Warning: Could not hash {audio_file_path} for the transcript cache: {e}")
+        return None
+    return audio_hash.hexdigest()
+
+def get_cache_key(audio_digest, options):
+    """
+    Build the transcript cache key for an audio file
+    
+    Args:
+        audio_digest (str): Digest of the audio file from hash_audio_file
+        options (dict): Transcription options that affect the result
+        
+    Returns:
+        str: Hex digest identifying the audio and options, or None if caching is
+            disabled or the audio couldn't be hashed
+    """
+    if not audio_digest or not cache_enabled():
+        return None
+    
+    options_hash = hashlib.sha256(json.dumps(options, sort_keys=True).encode('utf-8'))
+    return hashlib.sha256((audio_digest + options_hash.hexdigest()).encode('ascii')).hexdigest()
+
+def load_cached_transcript(cache_key):
+    """Return the cached transcript for a key, or None on a miss"""
+    if not cache_key:
+        return None
+    try:
+        with open(os.path.join(CACHE_DIR, f"{cache_key}.json"), 'r', encoding='utf-8') as f:
+            return from_json(f.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Warning: Ignoring unreadable transcript cache entry: {e}")
+        return None
+
+def save_cached_transcript(cache_key, transcript):
+    """Atomically store a transcript in the cache; failures are only reported"""
+    if not cache_key:
+        return
+    temp_path = None
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=CACHE_DIR,
+                                         suffix='.tmp', delete=False) as f:
+            temp_path = f.name
+            f.write(to_json(transcript))
+        os.replace(temp_path, os.path.join(CACHE_DIR, f"{cache_key}.json"))
+    except (OSError, TypeError) as e:
+        print(f"Warning: Could not write transcript cache: {e}")
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+@functools.lru_cache(maxsize=None)
+def get_speech_config(language, profanity_option, show_timestamps):
+    """
+    Get a shared speech configuration for the given recognition options
+    
+    Args:
+        language (str): Language code (e.g., "en-US")
+        profanity_option (str): How to handle profanity ("masked", "removed", or "raw")
+        show_timestamps (bool): Whether to request word-level timestamps
+        
+    Returns:
+        speechsdk.SpeechConfig: The speech configuration
+    """
+    speech_config = speechsdk.SpeechConfig(subscription=SPEECH_KEY, region=SPEECH_REGION)
+    speech_config.speech_recognition_language = language
+    
+    # Set profanity option
+    if profanity_option == "masked":
+        speech_config.set_profanity(speechsdk.ProfanityOption.Masked)
+    elif profanity_option == "removed":
+        speech_config.set_profanity(speechsdk.ProfanityOption.Removed)
+    elif profanity_option == "raw":
+        speech_config.set_profanity(speechsdk.ProfanityOption.Raw)
+    
+    # Enable word-level timestamps if requested
+    if show_timestamps:
+        speech_config.request_word_level_timestamps()
+    
+    return speech_config
+
 def transcribe_from_file(audio_file_path, language="en-US", profanity_option="masked", 
-                          output_format="simple", show_timestamps=False):
+                          output_format="simple", show_timestamps=False, split_on_silence=False,
+                          audio_digest=None):
     """
     Transcribe speech from an audio file using Azure AI Speech Services
     
@@ -52,102 +262,80 @@ def transcribe_from_file(audio_file_path, language="en-US", profanity_option="ma
         profanity_option (str): How to handle profanity ("masked", "removed", or "raw")
         output_format (str): Format of the output ("simple", "detailed", or "json")
         show_timestamps (bool): Whether to include timestamps in the output
+        split_on_silence (bool): Whether to split the audio at pauses and
+            transcribe the pieces in parallel (faster for long recordings)
+        audio_digest (str): Precomputed hash_audio_file digest; computed here if not given
         
     Returns:
         dict or str: Transcription result based on the specified output format
     """
     print(f"Transcribing audio file: {audio_file_path}")
     
-    # Ensure audio file is in WAV format (required for some Azure Speech features)
-    wav_file_path = convert_to_wav(audio_file_path)
-    temp_file = wav_file_path != audio_file_path
+    # Reuse the result of an earlier run on the same audio with the same options
+    if audio_digest is None and cache_enabled():
+        audio_digest = hash_audio_file(audio_file_path)
+    cache_key = get_cache_key(audio_digest, {
+        'language': language,
+        'profanity': profanity_option,
+        'format': output_format,
+        'timestamps': show_timestamps,
+        'split_on_silence': split_on_silence
+    })
+    cached = load_cached_transcript(cache_key)
+    if cached is not None:
+        print("Using cached transcript")
+        return cached
+    
+    errors = []
+    process = None
+    feeder = None
     
     try:
         # Configure speech recognition
-        speech_config = speechsdk.SpeechConfig(subscription=SPEECH_KEY, region=SPEECH_REGION)
-        speech_config.speech_recognition_language = language
-        
-        # Set profanity option
-        if profanity_option == "masked":
-            speech_config.set_profanity(speechsdk.ProfanityOption.Masked)
-        elif profanity_option == "removed":
-            speech_config.set_profanity(speechsdk.ProfanityOption.Removed)
-        elif profanity_option == "raw":
-            speech_config.set_profanity(speechsdk.ProfanityOption.Raw)
-        
-        # Enable word-level timestamps if requested
-        if show_timestamps:
-            speech_config.request_word_level_timestamps()
+        speech_config = get_speech_config(language, profanity_option, show_timestamps)
         
-        # Configure audio input
-        audio_config = speechsdk.audio.AudioConfig(filename=wav_file_path)
-        
-        # Standard speech recognition
-        speech_recognizer = speechsdk.SpeechRecognizer(speech_config=speech_config, audio_config=audio_config)
+        if split_on_silence:
+            if not ffmpeg_available():
+                return f"Transcription failed: FFmpeg is required to decode {audio_file_path}"
+            segments, completed = transcribe_split_on_silence(audio_file_path, speech_config, errors)
+        else:
+            # Configure audio input
+            if is_speech_ready_wav(audio_file_path):
+                # Compatible WAV files are read by the SDK directly
+                audio_config = speechsdk.audio.AudioConfig(filename=audio_file_path)
+            else:
+                # Decode with FFmpeg and push the PCM to the recognizer as it is produced,
+                # so conversion overlaps recognition and no temporary WAV is written
+                if not ffmpeg_available():
+                    return f"Transcription failed: FFmpeg is required to convert {audio_file_path}"
+                push_stream = create_push_stream()
+                audio_config = speechsdk.audio.AudioConfig(stream=push_stream)
+                error_log = tempfile.TemporaryFile()
+                process = open_pcm_stream(audio_file_path, stderr=error_log)
+                feeder = threading.Thread(target=push_pcm_stream, args=(process, error_log, push_stream, errors),
+                                          daemon=True)
+                feeder.start()
+            
+            # Start the recognition
+            print("Starting transcription... (this may take a while)")
+            all_results, completed = run_recognition(speech_config, audio_config,
+                                                     get_recognition_timeout(audio_file_path), errors)
+            
+            # Let the feeder finish so any FFmpeg failure is reported in errors.
+            # After a recognition error nobody reads the rest of the audio, so
+            # FFmpeg is stopped before the feeder is joined (see finally)
+            if feeder and completed and not errors:
+                feeder.join()
+            segments = [Segment(result.text, result.offset, result.duration) for result in all_results]
         
-        # Start the recognition
-        print("Starting transcription... (this may take a while)")
+        for error in errors:
+            print(f"Error during transcription: {error}")
         
-        # Process the entire audio file
-        all_results = []
-        done = False
-
-        def recognized_cb(evt):
-            if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech:
-                all_results.append(evt.result)
-            elif evt.result.reason == speechsdk.ResultReason.NoMatch:
-                print(f"NOMATCH: Speech could not be recognized.")
-
-        def stop_cb(evt):
-            print('CLOSING on {}'.format(evt))
-            nonlocal done
-            done = True
-
-        # Connect callbacks
-        speech_recognizer.recognized.connect(recognized_cb)
-        speech_recognizer.session_stopped.connect(stop_cb)
-        speech_recognizer.canceled.connect(stop_cb)
-
-        # Start continuous recognition
-        speech_recognizer.start_continuous_recognition()
-
-        # Wait for completion
-        start_time = time.time()  # Initialize start_time for the timeout
-        while not done:
-            time.sleep(0.5)
-            # Force stop after a timeout (you may need to adjust this for long files)
-            # In a real system, we'd calculate this based on audio duration
-            if len(all_results) > 0 and (time.time() - start_time) > 300:  # 5 minute timeout
-                print("Timeout reached, stopping recognition")
-                break
-
-        # Stop recognition
-        speech_recognizer.stop_continuous_recognition()
-
-        # Process results based on output format
-        if output_format == "json":
-            json_results = []
-            for result in all_results:
-                if show_timestamps and hasattr(result, 'result.properties'):
-                    json_results.append({
-                        'text': result.text,
-                        'offset': result.offset // 10000,  # Convert to milliseconds
-                        'duration': result.duration // 10000  # Convert to milliseconds
-                    })
-                else:
-                    json_results.append({'text': result.text})
-            return json_results
-        elif output_format == "detailed":
-            result_text = ""
-            for result in all_results:
-                if show_timestamps:
-                    timestamp = f"[{result.offset/10000000:.2f}s]"
-                    result_text += f"{timestamp} {result.text}\n"
-                else:
-                    result_text += f"{result.text}\n"
-            return result_text
-        else:  # simple format
-            return " ".join([result.text for result in all_results])
+        transcript = format_segments(segments, output_format, show_timestamps)
+        # Only cache complete transcripts
+        if completed and not errors:
+            save_cached_transcript(cache_key, transcript)
+        return transcript
             
     except Exception as e:
         print(f"Error during transcription: {e}")
@@ -155,13 +343,339 @@ def transcribe_from_file(audio_file_path, language="en-US", profanity_option="ma
         traceback.print_exc()
         return f"Transcription failed: {str(e)}"
     finally:
-        # Clean up the temporary WAV file if created during conversion
-        if temp_file and os.path.exists(wav_file_path) and wav_file_path != audio_file_path:
+        # Stop FFmpeg if recognition ended before the input was fully decoded;
+        # its stdout then ends and the feeder closes the push stream and exits
+        if process and process.poll() is None:
+            process.kill()
+        if feeder:
+            feeder.join()
+
+def run_recognition(speech_config, audio_config, timeout, errors, raise_transient=False):
+    """
+    Run continuous recognition until the audio ends or the timeout expires
+    
+    Args:
+        speech_config (speechsdk.SpeechConfig): Recognition configuration
+        audio_config (speechsdk.audio.AudioConfig): Audio input
+        timeout (float): Maximum seconds to wait for recognition to finish
+        errors (list): Receives the details of any cancellation error
+        raise_transient (bool): Raise instead of recording errors that are worth
+            retrying; only useful when the audio input can be replayed
+        
+    Returns:
+        tuple: (recognized results (list), completed before the timeout (bool))
+        
+    Raises:
+        TransientRecognitionError: If raise_transient is set and recognition
+            was canceled by a transient error
+    """
+    speech_recognizer = speechsdk.SpeechRecognizer(speech_config=speech_config, audio_config=audio_config)
+    
+    all_results = []
+    done_event = threading.Event()
+
+    def recognized_cb(evt):
+        if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech:
+            all_results.append(evt.result)
+        elif evt.result.reason == speechsdk.ResultReason.NoMatch:
+            print(f"NOMATCH: Speech could not be recognized.")
+
+    def stop_cb(evt):
+        print('CLOSING on {}'.format(evt))
+        done_event.set()
+
+    transient_errors = []
+
+    def canceled_cb(evt):
+        details = evt.cancellation_details
+        if details.reason == speechsdk.CancellationReason.Error:
+            if raise_transient and details.code in TRANSIENT_ERROR_CODES:
+                transient_errors.append(details.error_details)
+            else:
+                errors.append(details.error_details)
+        stop_cb(evt)
+
+    # Connect callbacks
+    speech_recognizer.recognized.connect(recognized_cb)
+    speech_recognizer.session_stopped.connect(stop_cb)
+    speech_recognizer.canceled.connect(canceled_cb)
+
+    # Start continuous recognition
+    speech_recognizer.start_continuous_recognition()
+
+    # Wait for the session to stop or be canceled, bounded by the audio duration
+    completed = done_event.wait(timeout=timeout)
+    if not completed:
+        print("Timeout reached, stopping recognition")
+
+    # Stop recognition
+    speech_recognizer.stop_continuous_recognition()
+    
+    if transient_errors:
+        raise TransientRecognitionError("; ".join(transient_errors))
+    return all_results, completed
+
+def create_push_stream():
+    """Create a push stream for 16-bit PCM, 16kHz, mono audio"""
+    return speechsdk.audio.PushAudioInputStream(
+        stream_format=speechsdk.audio.AudioStreamFormat(
+            samples_per_second=SAMPLE_RATE, bits_per_sample=16, channels=1))
+
+def find_silence_windows(samples, sample_rate=SAMPLE_RATE):
+    """
+    Split audio into windows, cutting each one at the quietest point between
+    SPLIT_MIN_WINDOW_SECONDS and SPLIT_MAX_WINDOW_SECONDS so words aren't cut
+    
+    Args:
+        samples (numpy.ndarray): Mono 16-bit PCM samples
+        sample_rate (int): Sample rate in Hz
+        
+    Returns:
+        list: (start_sample, end_sample) tuples covering the whole audio
+    """
+    frame_length = int(sample_rate * SPLIT_FRAME_SECONDS)
+    frame_count = len(samples) // frame_length
+    
+    # Mean square energy of each frame (ordered the same as RMS), computed a
+    # block of frames at a time so no float copy of the whole recording is made
+    frames = samples[:frame_count * frame_length].reshape(frame_count, frame_length)
+    energy = np.empty(frame_count, dtype=np.float32)
+    for block_start in range(0, frame_count, ENERGY_BLOCK_FRAMES):
+        block = frames[block_start:block_start + ENERGY_BLOCK_FRAMES]
+        energy[block_start:block_start + len(block)] = np.square(block, dtype=np.float32).mean(axis=1)
+    
+    min_frames = int(SPLIT_MIN_WINDOW_SECONDS / SPLIT_FRAME_SECONDS)
+    max_frames = int(SPLIT_MAX_WINDOW_SECONDS / SPLIT_FRAME_SECONDS)
+    
+    windows = []
+    start = 0
+    while frame_count - start > max_frames:
+        cut = start + min_frames + int(np.argmin(energy[start + min_frames:start + max_frames]))
+        windows.append((start * frame_length, cut * frame_length))
+        start = cut
+    windows.append((start * frame_length, len(samples)))
+    return windows
+
+def transcribe_split_on_silence(audio_file_path, speech_config, errors):
+    """
+    Transcribe an audio file as silence-delimited windows recognized in parallel
+    
+    Continuous recognition of one stream can't run faster than real time, so
+    long recordings are split and the windows recognized concurrently.
+    
+    Args:
+        audio_file_path (str): Path to the audio file
+        speech_config (speechsdk.SpeechConfig): Recognition configuration
+        errors (list): Receives recognition error details
+        
+    Returns:
+        tuple: (segments in audio order (list), all windows completed (bool))
+        
+    Raises:
+        subprocess.CalledProcessError: If FFmpeg fails to decode the input
+    """
+    process = open_pcm_stream(audio_file_path)
+    pcm, stderr = process.communicate()
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, process.args, stderr=stderr)
+    
+    samples = np.frombuffer(pcm, dtype='<i2')
+    windows = find_silence_windows(samples)
+    print(f"Split audio into {len(windows)} windows, transcribing in parallel...")
+    
+    @retry(retry=retry_if_exception_type(TransientRecognitionError),
+           stop=stop_after_attempt(MAX_ATTEMPTS), wait=wait_exponential_jitter(initial=1, max=30), reraise=True)
+    def recognize_window(start, end):
+        # The window is pushed again from memory on every attempt
+        push_stream = create_push_stream()
+        push_stream.write(samples[start:end].tobytes())
+        push_stream.close()
+        audio_config = speechsdk.audio.AudioConfig(stream=push_stream)
+        timeout = (end - start) / SAMPLE_RATE * TIMEOUT_DURATION_FACTOR + TIMEOUT_MARGIN_SECONDS
+        return run_recognition(speech_config, audio_config, timeout, errors, raise_transient=True)
+    
+    def transcribe_window(window):
+        start, end = window
+        try:
+            results, completed = recognize_window(start, end)
+        except TransientRecognitionError as e:
+            errors.append(str(e))
+            return [], False
+        
+        # Result offsets are relative to the window
+        offset = start * TICKS_PER_SECOND // SAMPLE_RATE
+        return [Segment(result.text, result.offset + offset, result.duration) for result in results], completed
+    
+    with ThreadPoolExecutor(max_workers=MAX_WINDOW_WORKERS) as executor:
+        window_results = list(executor.map(transcribe_window, windows))
+    
+    segments = [segment for window_segments, _ in window_results for segment in window_segments]
+    return segments, all(completed for _, completed in window_results)
+
+def push_pcm_stream(process, error_log, push_stream, errors):
+    """
+    Copy decoded PCM from an FFmpeg process into a Speech SDK push stream
+    
+    Args:
+        process (subprocess.Popen): Process started by open_pcm_stream
+        error_log (file): Temporary file receiving FFmpeg's stderr; closed when done
+        push_stream (speechsdk.audio.PushAudioInputStream): Stream read by the recognizer
+        errors (list): Receives a message if FFmpeg fails
+    """
+    with error_log:
+        try:
+            for chunk in iter(lambda: process.stdout.read(PUSH_CHUNK_SIZE), b''):
+                push_stream.write(chunk)
+        finally:
+            # Closing the stream signals end of audio to the recognizer
+            push_stream.close()
+            process.stdout.close()
+            returncode = process.wait()
+        
+        if returncode != 0:
+            error_log.seek(0)
+            stderr = error_log.read()
+            errors.append(f"FFmpeg failed to decode the input: {stderr.decode('utf-8', errors='replace').strip()}")
+
+def format_segments(segments, output_format="simple", show_timestamps=False):
+    """
+    Format recognized segments for output
+    
+    Args:
+        segments (list): Segment tuples in recognition order
+        output_format (str): Format of the output ("simple", "detailed", or "json")
+        show_timestamps (bool): Whether to include timestamps in the output
+        
+    Returns:
+        list or str: Transcription result based on the specified output format
+    """
+    if output_format == "json":
+        json_results = []
+        for segment in segments:
+            if show_timestamps:
+                json_results.append({
+                    'text': segment.text,
+                    'offset': int(segment.offset * TICKS_TO_MS),
+                    'duration': int(segment.duration * TICKS_TO_MS)
+                })
+            else:
+                json_results.append({'text': segment.text})
+        return json_results
+    elif output_format == "detailed":
+        if show_timestamps:
+            lines = [f"[{segment.offset * TICKS_TO_SECONDS:.2f}s] {segment.text}" for segment in segments]
+        else:
+            lines = [segment.text for segment in segments]
+        return "\n".join(lines) + "\n" if lines else ""
+    else:  # simple format
+        return " ".join([segment.text for segment in segments])
+
+def transcribe_from_file_batch(audio_url, language="en-US", profanity_option="masked",
+                               output_format="simple", show_timestamps=False):
+    """
+    Transcribe a hosted audio file using the Azure Batch Transcription REST API.
+    Batch jobs run server-side faster than real time, so this is the better
+    choice for recordings longer than a few minutes.
+    
+    Args:
+        audio_url (str): URL of the audio file (e.g. an Azure blob SAS URL)
+        language (str): Language code (e.g., "en-US")
+        profanity_option (str): How to handle profanity ("masked", "removed", or "raw")
+        output_format (str): Format of the output ("simple", "detailed", or "json")
+        show_timestamps (bool): Whether to include timestamps in the output
+        
+    Returns:
+        dict or str: Transcription result based on the specified output format
+    """
+    print(f"Submitting batch transcription for: {audio_url}")
+    
+    headers = {"Ocp-Apim-Subscription-Key": SPEECH_KEY}
+    body = {
+        "contentUrls": [audio_url],
+        "locale": language,
+        "displayName": f"Transcription of {os.path.basename(audio_url.split('?')[0])}",
+        "properties": {
+            "profanityFilterMode": BATCH_PROFANITY_MODES[profanity_option],
+            "wordLevelTimestampsEnabled": show_timestamps
+        }
+    }
+    
+    try:
+        with requests.Session() as session:
+            session.headers.update(headers)
+            
+            response = session.post(BATCH_API_URL, json=body)
+            response.raise_for_status()
+            job_url = response.json()["self"]
+            print(f"Batch transcription job created: {job_url}")
+            
             try:
-                os.remove(wav_file_path)
-                print(f"Removed temporary file: {wav_file_path}")
-            except Exception as e:
-                print(f"Warning: Could not remove temporary file {wav_file_path}: {e}")
+                job = wait_for_batch_job(session, job_url)
+                if job is None:
+                    return f"Transcription failed: batch job did not finish within {BATCH_MAX_WAIT_SECONDS} seconds"
+                if job.get("status") == "Failed":
+                    error = job.get("properties", {}).get("error", {})
+                    return f"Transcription failed: {error.get('message', 'batch job failed')}"
+                
+                # Find the transcription result among the job's output files
+                response = session.get(job["links"]["files"])
+                response.raise_for_status()
+                result_urls = [f["links"]["contentUrl"] for f in response.json()["values"]
+                               if f.get("kind") == "Transcription"]
+                if not result_urls:
+                    return "Transcription failed: batch job produced no transcription"
+                
+                response = session.get(result_urls[0])
+                response.raise_for_status()
+                phrases = response.json().get("recognizedPhrases", [])
+            finally:
+                delete_batch_job(session, job_url)
+    except (requests.RequestException, KeyError, ValueError) as e:
+        print(f"Error during batch transcription: {e}")
+        return f"Transcription failed: {str(e)}"
+    
+    segments = [Segment(phrase["nBest"][0]["display"], phrase["offsetInTicks"], phrase["durationInTicks"])
+                for phrase in phrases if phrase.get("nBest")]
+    segments.sort(key=lambda segment: segment.offset)
+    return format_segments(segments, output_format, show_timestamps)
+
+def wait_for_batch_job(session, job_url):
+    """
+    Poll a batch transcription job until it finishes or BATCH_MAX_WAIT_SECONDS pass
+    
+    Args:
+        session (requests.Session): Session carrying the subscription key
+        job_url (str): URL of the transcription job
+        
+    Returns:
+        dict: The finished job (status "Succeeded" or "Failed"), or None on timeout
+    """
+    deadline = time.monotonic() + BATCH_MAX_WAIT_SECONDS
+    while True:
+        response = session.get(job_url)
+        response.raise_for_status()
+        job = response.json()
+        status = job.get("status")
+        if status in ("Succeeded", "Failed"):
+            return job
+        if time.monotonic() + BATCH_POLL_INTERVAL > deadline:
+            print(f"Timed out waiting for batch transcription (last status: {status})")
+            return None
+        print(f"Batch transcription status: {status}")
+        time.sleep(BATCH_POLL_INTERVAL)
+
+def delete_batch_job(session, job_url):
+    """
+    Delete a batch transcription job so finished jobs don't pile up on the Speech resource
+    """
+    try:
+        session.delete(job_url).raise_for_status()
+    except requests.RequestException as e:
+        print(f"Warning: could not delete batch transcription job {job_url}: {e}")
+
+def is_url(path):
+    """Check whether an input refers to hosted audio rather than a local file"""
+    return path.startswith(("http://", "https://"))
 
 def save_transcript(transcript, output_file=None, input_file=None):
     """
@@ -177,8 +691,8 @@ def save_transcript(transcript, output_file=None, input_file=None):
     """
     # Generate default output filename if not provided
     if not output_file and input_file:
-        input_path = Path(input_file)
-        output_file = str(input_path.with_suffix('.txt'))
+        base, _ = os.path.splitext(input_file)
+        output_file = f"{base}.txt"
     
     # Use a default name if we still don't have one
     if not output_file:
@@ -186,9 +700,11 @@ def save_transcript(transcript, output_file=None, input_file=None):
     
     try:
         # Handle dict/json output
-        if isinstance(transcript, (dict, list)):
+        if isinstance(transcript, list):
+            return save_transcript_stream(transcript, output_file)
+        elif isinstance(transcript, dict):
             with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(transcript, f, indent=2, ensure_ascii=False)
+                f.write(to_json(transcript, indent=True))
         else:
             with open(output_file, 'w', encoding='utf-8') as f:
                 f.write(transcript)
@@ -199,44 +715,135 @@ def save_transcript(transcript, output_file=None, input_file=None):
         print(f"Error saving transcript: {e}")
         return None
 
+def save_transcript_stream(iter_results, output_file):
+    """
+    Write JSON transcript records to a file one at a time, without building
+    the serialized document in memory
+    
+    Args:
+        iter_results (iterable): JSON-serializable transcript records
+        output_file (str): Path to save the transcript to
+        
+    Returns:
+        str: Path to the saved transcript file
+    """
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write("[")
+        first = True
+        for record in iter_results:
+            f.write("\n  " if first else ",\n  ")
+            f.write(to_json(record))
+            first = False
+        f.write("]" if first else "\n]")
+    
+    print(f"Transcript saved to: {output_file}")
+    return output_file
+
+async def transcribe_files(inputs, args):
+    """
+    Transcribe several audio files concurrently
+    
+    The Speech SDK calls block, so each transcription runs in a worker thread
+    and the event loop overlaps them, at most args.concurrency at a time.
+    
+    Args:
+        inputs (list): Paths or URLs of the audio files to transcribe
+        args (argparse.Namespace): Parsed command line options
+        
+    Returns:
+        list: Transcript for each input, in input order
+    """
+    loop = asyncio.get_running_loop()
+    
+    # Hash all local files up front for the cache lookups; hashlib releases the
+    # GIL, so the files are hashed in parallel
+    local_files = [audio_input for audio_input in inputs if not (args.batch or is_url(audio_input))]
+    digests = {}
+    if local_files and cache_enabled():
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            digests = dict(zip(local_files, executor.map(hash_audio_file, local_files)))
+    
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        tasks = []
+        for audio_input in inputs:
+            options = dict(language=args.language,
+                           profanity_option=args.profanity,
+                           output_format=args.format,
+                           show_timestamps=args.timestamps)
+            if args.batch or is_url(audio_input):
+                transcribe = transcribe_from_file_batch
+            else:
+                transcribe = transcribe_from_file
+                options['split_on_silence'] = args.split_on_silence
+                options['audio_digest'] = digests.get(audio_input)
+            tasks.append(loop.run_in_executor(executor, functools.partial(transcribe, audio_input, **options)))
+        return await asyncio.gather(*tasks)
+
+def positive_int(value):
+    """Parse a command line value that must be an integer of at least 1"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
 def main():
     parser = argparse.ArgumentParser(description="Transcribe speech from audio/video files")
     
-    parser.add_argument("input", help="Path to the audio/video file to transcribe")
-    parser.add_argument("--output", "-o", help="Path to save the transcript (default: same as input with .txt extension)")
+    parser.add_argument("input", nargs="+", help="Path(s) or URL(s) of the audio/video file(s) to transcribe")
+    parser.add_argument("--output", "-o", help="Path to save the transcript (default: same as input with .txt extension; single input only)")
     parser.add_argument("--language", "-l", default="en-US", help="Language code (default: en-US)")
     parser.add_argument("--profanity", choices=["masked", "removed", "raw"], default="masked",
                         help="How to handle profanity (default: masked)")
     parser.add_argument("--format", choices=["simple", "detailed", "json"], default="simple",
                         help="Output format (default: simple)")
     parser.add_argument("--timestamps", action="store_true", help="Include timestamps in the output")
+    parser.add_argument("--batch", action="store_true",
+                        help="Use Azure Batch Transcription (faster for long recordings; input must be a URL). "
+                             "URL inputs always use batch transcription")
+    parser.add_argument("--concurrency", type=positive_int, default=DEFAULT_CONCURRENCY,
+                        help=f"Maximum number of files to transcribe at once (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--split-on-silence", action="store_true",
+                        help="Split local files at pauses and transcribe the pieces in parallel "
+                             "(faster for long recordings)")
     
     args = parser.parse_args()
     
-    # Check that the input file exists
-    if not os.path.exists(args.input):
-        print(f"Error: Input file not found: {args.input}")
+    if args.output and len(args.input) > 1:
+        print("Error: --output can only be used with a single input file")
         return 1
     
+    for audio_input in args.input:
+        if is_url(audio_input):
+            continue
+        if args.batch:
+            print("Error: Batch transcription requires an audio URL (e.g. an Azure blob SAS URL)")
+            return 1
+        
+        # Check that the input file exists
+        if not os.path.exists(audio_input):
+            print(f"Error: Input file not found: {audio_input}")
+            return 1
+    
     # Start timing
     start_time = time.time()
     
-    # Transcribe the audio file
-    transcript = transcribe_from_file(
-        args.input, 
-        language=args.language,
-        profanity_option=args.profanity,
-        output_format=args.format,
-        show_timestamps=args.timestamps
-    )
+    # Transcribe the audio files
+    transcripts = asyncio.run(transcribe_files(args.input, args))
     
     # Calculate elapsed time
     elapsed_time = time.time() - start_time
     print(f"Transcription completed in {elapsed_time:.2f} seconds")
     
-    # Save the transcript
-    if transcript:
-        save_transcript(transcript, args.output, args.input)
+    for audio_input, transcript in zip(args.input, transcripts):
+        if not transcript:
+            continue
+        
+        # Save the transcript; for URLs, name the default output after the file part of the URL
+        input_name = os.path.basename(audio_input.split('?')[0]) if is_url(audio_input) else audio_input
+        save_transcript(transcript, args.output, input_name)
         
         # Print a preview of the transcript
         if isinstance(transcript, (dict, list)):
@@ -14,9 +14,26 @@ import sys
 import argparse
 import json
 import time
-from pathlib import Path
+import asyncio
+import re
+from functools import lru_cache
 from dotenv import load_dotenv
-from openai import AzureOpenAI
+from openai import AsyncAzureOpenAI, APIConnectionError, InternalServerError, RateLimitError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    # Optional, the standard json module is used without it
+    ORJSON_AVAILABLE = False
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    # Optional, token counts are estimated from the character count without it
+    TIKTOKEN_AVAILABLE = False
 
 # Load environment variables from .env file
 env_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
@@ -35,6 +52,35 @@ AZURE_OPENAI_API_VERSION = os.environ.get('AZURE_OPENAI_API_VERSION', '2023-05-1
 # Fallback to regular OpenAI API if Azure not configured
 OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY', None)
 
+# Maximum number of chat completion requests in flight at once
+DEFAULT_CONCURRENCY = 5
+
+# Default token budget per request, prompt and completion together; fits the
+# smallest gpt-35-turbo context. Raise it with --max-tokens for larger models
+DEFAULT_MAX_TOKENS = 4000
+
+# Retries for rate limits and transient service errors; a Retry-After header
+# from the service takes precedence over the exponential backoff
+MAX_ATTEMPTS = 5
+RETRY_BACKOFF = wait_exponential_jitter(initial=1, max=30)
+
+# Leading whitespace then the start of a JSON object or array
+JSON_START = re.compile(rb'\s*[\[{]')
+
+# Context given with each chunk of a long transcript
+CHUNK_NOTE = ("Note: This is part of a longer transcript. Focus on improving this section "
+              "while maintaining its consistency with the whole.")
+
+# The improved text is about as long as the original, so each request reserves
+# this many completion tokens per transcript token, with headroom for growth
+OUTPUT_TOKEN_RATIO = 1.25
+
+# Tokens for chat message formatting and the instruction line of the user message
+MESSAGE_OVERHEAD_TOKENS = 32
+
+class TruncatedCompletionError(Exception):
+    """A completion stopped at its max_tokens limit, so its text is incomplete"""
+
 def load_transcript(input_file):
     """
     Load a transcript from a file
@@ -46,17 +92,22 @@ def load_transcript(input_file):
         str or dict: The loaded transcript
     """
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
+        with open(input_file, 'rb') as f:
             content = f.read()
-            
-            # Try to parse as JSON if it appears to be JSON
-            if content.strip().startswith('{') or content.strip().startswith('['):
-                try:
-                    return json.loads(content)
-                except json.JSONDecodeError:
-                    # Not valid JSON, treat as plain text
-                    return content
-            return content
+        
+        # Try to parse as JSON if it appears to be JSON; matching in place avoids
+        # copying the whole file just to strip leading whitespace
+        if JSON_START.match(content):
+            try:
+                return orjson.loads(content) if ORJSON_AVAILABLE else json.loads(content)
+            except json.JSONDecodeError:  # orjson.JSONDecodeError is a subclass
+                # Not valid JSON, treat as plain text
+                pass
+        text = content.decode('utf-8')
+        # Match text mode's universal newlines
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text
     except Exception as e:
         print(f"Error loading transcript: {e}")
         return None
@@ -84,11 +135,12 @@ def format_transcript_for_gpt(transcript):
         if all(isinstance(item, dict) for item in transcript):
             # Check if these are utterances with speaker info
             if all('text' in item for item in transcript):
-                formatted_text = ""
-                for item in transcript:
-                    speaker = f"Speaker {item.get('speaker', 'Unknown')}: " if 'speaker' in item else ""
-                    formatted_text += f"{speaker}{item.get('text', '')}\n"
-                return formatted_text
+                if not any('speaker' in item for item in transcript):
+                    lines = [item['text'] for item in transcript]
+                else:
+                    lines = [f"Speaker {item['speaker']}: {item['text']}" if 'speaker' in item else item['text']
+                             for item in transcript]
+                return "\n".join(lines) + "\n" if lines else ""
             else:
                 # Return a JSON string if we don't understand the structure
                 return json.dumps(transcript, indent=2)
@@ -99,10 +151,105 @@ def format_transcript_for_gpt(transcript):
         # Assume it's already a string
         return transcript
 
+@lru_cache(maxsize=None)
+def get_encoding(model):
+    """Get the tiktoken encoding for a model or deployment name"""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        # Azure deployment names are arbitrary; GPT-3.5/GPT-4 use cl100k_base
+        return tiktoken.get_encoding("cl100k_base")
+
+def count_tokens(text, model):
+    """
+    Count the tokens in a piece of text
+    
+    Args:
+        text (str): The text to count
+        model (str): The model or deployment name the text is sent to
+        
+    Returns:
+        int: Number of tokens (estimated if tiktoken is not installed)
+    """
+    if TIKTOKEN_AVAILABLE:
+        return len(get_encoding(model).encode(text, disallowed_special=()))
+    return len(text) // 4  # English averages about four characters per token
+
+def wait_for_retry(retry_state):
+    """Seconds to wait before the next attempt, honoring the service's Retry-After header"""
+    response = getattr(retry_state.outcome.exception(), 'response', None)
+    retry_after = response.headers.get('retry-after') if response is not None else None
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return RETRY_BACKOFF(retry_state)
+
+def use_azure_openai():
+    """Whether Azure OpenAI is fully configured, rather than the standard OpenAI API"""
+    return bool(AZURE_OPENAI_KEY and AZURE_OPENAI_ENDPOINT and AZURE_OPENAI_DEPLOYMENT)
+
+def get_openai_client(use_azure):
+    """
+    Create an async OpenAI client whose connection pool is shared by every request made with it
+    
+    Async clients can't be shared between event loops, so create one per
+    asyncio.run and use it with `async with` to close its connections.
+    
+    Args:
+        use_azure (bool): Whether to use Azure OpenAI or the standard OpenAI API
+        
+    Returns:
+        AsyncAzureOpenAI or AsyncOpenAI: The client
+    """
+    # Retries are handled by stream_completion, so turn off the client's own
+    if use_azure:
+        return AsyncAzureOpenAI(
+            api_key=AZURE_OPENAI_KEY,
+            api_version=AZURE_OPENAI_API_VERSION,
+            azure_endpoint=AZURE_OPENAI_ENDPOINT,
+            max_retries=0
+        )
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=OPENAI_API_KEY, max_retries=0)
+
+@retry(retry=retry_if_exception_type((RateLimitError, APIConnectionError, InternalServerError)),
+       stop=stop_after_attempt(MAX_ATTEMPTS), wait=wait_for_retry, reraise=True)
+async def stream_completion(client, **kwargs):
+    """
+    Run a chat completion with streaming and collect the generated text
+    
+    Tokens are received while they are generated instead of in one response
+    at the end, so other requests on the event loop progress in the meantime.
+    Rate limits and transient errors are retried with backoff.
+    
+    Args:
+        client: The async OpenAI client (Azure or standard)
+        **kwargs: Arguments for client.chat.completions.create
+        
+    Returns:
+        str: The full generated message content
+        
+    Raises:
+        TruncatedCompletionError: If the completion was cut off at max_tokens
+    """
+    stream = await client.chat.completions.create(stream=True, **kwargs)
+    parts = []
+    finish_reason = None
+    async for chunk in stream:
+        # Azure sends content filter results in chunks without choices
+        if chunk.choices:
+            if chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+            finish_reason = chunk.choices[0].finish_reason or finish_reason
+    if finish_reason == "length":
+        raise TruncatedCompletionError(f"completion was cut off at {kwargs.get('max_tokens')} tokens")
+    return "".join(parts)
+
 def improve_transcript_with_gpt(transcript_text, model="gpt-35-turbo", 
                                 preserve_speakers=True, 
                                 formality_level="neutral",
-                                max_tokens=4000):
+                                max_tokens=DEFAULT_MAX_TOKENS,
+                                max_concurrent=DEFAULT_CONCURRENCY):
     """
     Improve a transcript using Azure OpenAI
     
@@ -111,33 +258,65 @@ def improve_transcript_with_gpt(transcript_text, model="gpt-35-turbo",
         model (str): The GPT model deployment name to use
         preserve_speakers (bool): Whether to preserve speaker annotations
         formality_level (str): Desired formality level (casual, neutral, formal)
-        max_tokens (int): Maximum number of tokens to process at once
+        max_tokens (int): Maximum tokens per request, prompt and completion together
+        max_concurrent (int): Maximum number of chunks to process at once
         
     Returns:
         str: The improved transcript
     """
-    # Check for Azure OpenAI credentials
-    if not AZURE_OPENAI_KEY or not AZURE_OPENAI_ENDPOINT or not AZURE_OPENAI_DEPLOYMENT:
-        if not OPENAI_API_KEY:
-            print("Error: Neither Azure OpenAI nor OpenAI credentials are properly configured")
-            print("Please check your .env file and ensure either:")
-            print("- AZURE_OPENAI_KEY, AZURE_OPENAI_ENDPOINT, and AZURE_OPENAI_DEPLOYMENT are set for Azure OpenAI")
-            print("- OPENAI_API_KEY is set for standard OpenAI API")
-            return None
+    return asyncio.run(improve_transcript_async(
+        transcript_text, model, preserve_speakers, formality_level, max_tokens, max_concurrent
+    ))
+
+async def improve_transcript_async(transcript_text, model="gpt-35-turbo",
+                                   preserve_speakers=True,
+                                   formality_level="neutral",
+                                   max_tokens=DEFAULT_MAX_TOKENS,
+                                   max_concurrent=DEFAULT_CONCURRENCY,
+                                   semaphore=None,
+                                   client=None):
+    """
+    Improve a transcript using Azure OpenAI without blocking the event loop
+    
+    Args:
+        transcript_text (str): The transcript text to improve
+        model (str): The GPT model deployment name to use
+        preserve_speakers (bool): Whether to preserve speaker annotations
+        formality_level (str): Desired formality level (casual, neutral, formal)
+        max_tokens (int): Maximum tokens per request, prompt and completion together
+        max_concurrent (int): Maximum number of chunks to process at once
+        semaphore (asyncio.Semaphore): Shared limit on concurrent requests across
+            several transcripts; overrides max_concurrent
+        client: Async OpenAI client from get_openai_client to share across
+            several transcripts; one is created and closed here if not given
         
+    Returns:
+        str: The improved transcript
+    """
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max_concurrent)
+    
+    # Check for Azure OpenAI credentials
+    use_azure = use_azure_openai()
+    if not use_azure and not OPENAI_API_KEY:
+        print("Error: Neither Azure OpenAI nor OpenAI credentials are properly configured")
+        print("Please check your .env file and ensure either:")
+        print("- AZURE_OPENAI_KEY, AZURE_OPENAI_ENDPOINT, and AZURE_OPENAI_DEPLOYMENT are set for Azure OpenAI")
+        print("- OPENAI_API_KEY is set for standard OpenAI API")
+        return None
+    
+    if client is None:
+        # Use one client for every chunk of this transcript, closing it when done
+        async with get_openai_client(use_azure) as client:
+            return await improve_transcript_async(transcript_text, model, preserve_speakers, formality_level,
+                                                  max_tokens, max_concurrent, semaphore, client)
+    
+    if use_azure:
+        deployment_model = AZURE_OPENAI_DEPLOYMENT  # Use deployment name from env var
+    else:
         # Fall back to standard OpenAI API if Azure credentials are missing
-        from openai import OpenAI
         print("Warning: Azure OpenAI credentials not found, falling back to standard OpenAI API")
-        client = OpenAI(api_key=OPENAI_API_KEY)
         deployment_model = model  # Use the model parameter directly
-    else:
-        # Use Azure OpenAI
-        client = AzureOpenAI(
-            api_key=AZURE_OPENAI_KEY,
-            api_version=AZURE_OPENAI_API_VERSION,
-            azure_endpoint=AZURE_OPENAI_ENDPOINT
-        )
-        deployment_model = AZURE_OPENAI_DEPLOYMENT  # Use deployment name from env var
     
     # Create the system prompt based on the options
     system_prompt = f"""You are an expert transcript editor. Your task is to improve a transcript by:
@@ -155,98 +334,134 @@ The transcript should sound natural and flow well when read aloud.
         system_prompt += "\nMaintain all speaker labels and turns of speech exactly as in the original."
     
     try:
-        # For long transcripts, we need to process in chunks
-        if len(transcript_text) > max_tokens * 2:  # Rough character estimate
-            return improve_long_transcript(transcript_text, system_prompt, deployment_model, max_tokens, client)
+        # For long transcripts, we need to process in chunks; the request must
+        # leave room for an improved text about as long as the original
+        prompt_tokens = count_tokens(system_prompt, deployment_model) + MESSAGE_OVERHEAD_TOKENS
+        transcript_tokens = count_tokens(transcript_text, deployment_model)
+        if prompt_tokens + transcript_tokens * (1 + OUTPUT_TOKEN_RATIO) > max_tokens:
+            return await improve_long_transcript(transcript_text, system_prompt, deployment_model,
+                                                 max_tokens, client, semaphore)
         
         # For shorter transcripts, process all at once
-        response = client.chat.completions.create(
-            model=deployment_model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Please improve this transcript:\n\n{transcript_text}"}
-            ],
-            temperature=0.3,  # Lower temperature for more consistent editing
-            max_tokens=max_tokens
-        )
+        async with semaphore:
+            improved_text = await stream_completion(
+                client,
+                model=deployment_model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": f"Please improve this transcript:\n\n{transcript_text}"}
+                ],
+                temperature=0.3,  # Lower temperature for more consistent editing
+                max_tokens=max_tokens - prompt_tokens - transcript_tokens
+            )
         
-        # Extract the improved transcript from the response
-        improved_text = response.choices[0].message.content
         return improved_text
     
     except Exception as e:
         print(f"Error improving transcript with Azure OpenAI: {e}")
         return None
 
-def improve_long_transcript(transcript_text, system_prompt, deployment_model, max_tokens, client):
+def split_transcript(transcript_text, max_chunk_tokens, model):
     """
-    Process a long transcript in chunks
+    Split a transcript into chunks of at most max_chunk_tokens tokens
     
     Args:
         transcript_text (str): The full transcript text
-        system_prompt (str): The system prompt to use
-        deployment_model (str): The deployment model name to use
-        max_tokens (int): Maximum tokens per chunk
-        client: The OpenAI client (Azure or standard)
+        max_chunk_tokens (int): Target maximum tokens per chunk
+        model (str): The model or deployment name the chunks are sent to
         
     Returns:
-        str: The improved full transcript
+        list: Chunk texts in transcript order
     """
-    print(f"Transcript is long ({len(transcript_text)} chars). Processing in chunks...")
-    
     # Split by paragraphs or lines
     if "\n\n" in transcript_text:
-        chunks = transcript_text.split("\n\n")
+        pieces = transcript_text.split("\n\n")
     else:
-        chunks = transcript_text.split("\n")
+        pieces = transcript_text.split("\n")
     
-    # Combine chunks to fit within token limits (rough estimate)
-    processed_chunks = []
+    # Combine pieces to fit within the token budget; a piece larger than the
+    # budget becomes a chunk of its own
+    chunks = []
     current_chunk = []
-    current_length = 0
-    chunk_size = max_tokens * 2  # Rough character to token ratio
-    
-    for chunk in chunks:
-        if current_length + len(chunk) > chunk_size and current_chunk:
-            # Process the current combined chunk
-            chunk_text = "\n".join(current_chunk)
-            improved_chunk = process_chunk(chunk_text, system_prompt, deployment_model, client)
-            processed_chunks.append(improved_chunk)
+    current_tokens = 0
+    
+    for piece in pieces:
+        # Each piece is counted once; +1 for the newline joining it to the chunk
+        piece_tokens = count_tokens(piece, model) + 1
+        if current_tokens + piece_tokens > max_chunk_tokens and current_chunk:
+            chunks.append("\n".join(current_chunk))
             
             # Reset for next chunk
-            current_chunk = [chunk]
-            current_length = len(chunk)
+            current_chunk = [piece]
+            current_tokens = piece_tokens
         else:
-            current_chunk.append(chunk)
-            current_length += len(chunk)
+            current_chunk.append(piece)
+            current_tokens += piece_tokens
     
-    # Process any remaining content
+    # Keep any remaining content
     if current_chunk:
-        chunk_text = "\n".join(current_chunk)
-        improved_chunk = process_chunk(chunk_text, system_prompt, deployment_model, client)
-        processed_chunks.append(improved_chunk)
+        chunks.append("\n".join(current_chunk))
+    
+    return chunks
+
+async def improve_long_transcript(transcript_text, system_prompt, deployment_model, max_tokens, client,
+                                  semaphore):
+    """
+    Process a long transcript in chunks, several chunks at a time
+    
+    Args:
+        transcript_text (str): The full transcript text
+        system_prompt (str): The system prompt to use
+        deployment_model (str): The deployment model name to use
+        max_tokens (int): Maximum tokens per request, prompt and completion together
+        client: The async OpenAI client (Azure or standard)
+        semaphore (asyncio.Semaphore): Limits concurrent requests
+        
+    Returns:
+        str: The improved full transcript
+    """
+    print(f"Transcript is long ({len(transcript_text)} chars). Processing in chunks...")
+    
+    # Leave room in each request for the system prompt, the chunk note and
+    # the improved chunk, which is about as long as the original
+    prompt_tokens = (count_tokens(system_prompt, deployment_model) + count_tokens(CHUNK_NOTE, deployment_model)
+                     + MESSAGE_OVERHEAD_TOKENS)
+    chunk_tokens = int((max_tokens - prompt_tokens) / (1 + OUTPUT_TOKEN_RATIO))
+    chunks = split_transcript(transcript_text, max(chunk_tokens, 1), deployment_model)
+    
+    async def bounded(chunk_text):
+        # Everything the prompt doesn't use is available for the completion
+        completion_tokens = max(max_tokens - prompt_tokens - count_tokens(chunk_text, deployment_model), 1)
+        async with semaphore:
+            return await process_chunk(chunk_text, system_prompt, deployment_model, client, completion_tokens)
+    
+    # gather keeps results in chunk order
+    results = await asyncio.gather(*[bounded(chunk) for chunk in chunks], return_exceptions=True)
+    
+    # Keep the original text for any chunk that failed
+    processed_chunks = [chunk if isinstance(result, BaseException) else result
+                        for chunk, result in zip(chunks, results)]
     
     # Combine all improved chunks
     return "\n\n".join(processed_chunks)
 
-def process_chunk(chunk_text, system_prompt, deployment_model, client):
-    """Process a single chunk of the transcript"""
+async def process_chunk(chunk_text, system_prompt, deployment_model, client, max_tokens):
+    """Process a single chunk of the transcript, generating at most max_tokens tokens"""
     try:
         print(f"Processing chunk of {len(chunk_text)} characters...")
         
-        # Add context for partial processing
-        chunk_prompt = system_prompt + "\nNote: This is part of a longer transcript. Focus on improving this section while maintaining its consistency with the whole."
-        
-        response = client.chat.completions.create(
+        # The system prompt is sent unchanged for every chunk so the service can
+        # reuse its cached prefix; the chunk context goes in the user message
+        improved_chunk = await stream_completion(
+            client,
             model=deployment_model,
             messages=[
-                {"role": "system", "content": chunk_prompt},
-                {"role": "user", "content": f"Please improve this transcript section:\n\n{chunk_text}"}
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": f"{CHUNK_NOTE}\n\nPlease improve this transcript section:\n\n{chunk_text}"}
             ],
-            temperature=0.3
+            temperature=0.3,
+            max_tokens=max_tokens
         )
-        
-        improved_chunk = response.choices[0].message.content
         return improved_chunk
     
     except Exception as e:
@@ -268,9 +483,8 @@ def save_improved_transcript(improved_text, output_file=None, input_file=None):
     """
     # Generate default output filename if not provided
     if not output_file and input_file:
-        input_path = Path(input_file)
-        stem = input_path.stem
-        output_file = str(input_path.with_name(f"{stem}_improved{input_path.suffix}"))
+        base, ext = os.path.splitext(input_file)
+        output_file = f"{base}_improved{ext}"
     
     # Use a default name if we still don't have one
     if not output_file:
@@ -286,28 +500,86 @@ def save_improved_transcript(improved_text, output_file=None, input_file=None):
         print(f"Error saving improved transcript: {e}")
         return None
 
+async def improve_files(input_files, args):
+    """
+    Improve several transcript files concurrently
+    
+    Args:
+        input_files (list): Paths of the transcript files to improve
+        args (argparse.Namespace): Parsed command line options
+        
+    Returns:
+        list: Improved transcript (or None on failure) for each input file
+    """
+    # One semaphore across all files so --concurrency caps the total request count,
+    # and one client so they share its connection pool
+    semaphore = asyncio.Semaphore(args.concurrency)
+    client = get_openai_client(use_azure_openai())
+    
+    async def improve_file(input_file):
+        # Load the transcript
+        transcript = load_transcript(input_file)
+        if not transcript:
+            return None
+        
+        # Format the transcript for GPT
+        formatted_transcript = format_transcript_for_gpt(transcript)
+        
+        return await improve_transcript_async(
+            formatted_transcript,
+            model=args.model,
+            preserve_speakers=not args.no_preserve_speakers,
+            formality_level=args.formality,
+            max_tokens=args.max_tokens,
+            semaphore=semaphore,
+            client=client
+        )
+    
+    async with client:
+        return await asyncio.gather(*[improve_file(input_file) for input_file in input_files])
+
+def positive_int(value):
+    """Parse a command line value that must be an integer of at least 1"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
 def main():
     parser = argparse.ArgumentParser(description="Improve transcripts using Azure OpenAI")
     
-    parser.add_argument("input", help="Path to the transcript file to improve")
-    parser.add_argument("--output", "-o", help="Path to save the improved transcript")
+    parser.add_argument("input", nargs="+", help="Path(s) to the transcript file(s) to improve")
+    parser.add_argument("--output", "-o", help="Path to save the improved transcript (single input only)")
     parser.add_argument("--model", default="gpt-35-turbo", 
                         help="Model deployment name (default: gpt-35-turbo)")
     parser.add_argument("--no-preserve-speakers", action="store_true", 
                         help="Don't preserve speaker annotations")
     parser.add_argument("--formality", choices=["casual", "neutral", "formal"], 
                         default="neutral", help="Formality level of the output")
+    parser.add_argument("--max-tokens", type=positive_int, default=DEFAULT_MAX_TOKENS,
+                        help=f"Token budget per request, prompt and completion together; set it to "
+                             f"your model's context size (default: {DEFAULT_MAX_TOKENS})")
+    parser.add_argument("--concurrency", type=positive_int, default=DEFAULT_CONCURRENCY,
+                        help=f"Maximum number of requests in flight at once (default: {DEFAULT_CONCURRENCY})")
     
     args = parser.parse_args()
     
-    # Check that the input file exists
-    if not os.path.exists(args.input):
-        print(f"Error: Input file not found: {args.input}")
+    if args.output and len(args.input) > 1:
+        print("Error: --output can only be used with a single input file")
         return 1
     
+    # Check that the input files exist
+    for input_file in args.input:
+        if not os.path.exists(input_file):
+            print(f"Error: Input file not found: {input_file}")
+            return 1
+    
     # Check for API credentials
-    if not AZURE_OPENAI_KEY and not OPENAI_API_KEY:
-        print("Error: Neither AZURE_OPENAI_KEY nor OPENAI_API_KEY environment variables are set")
+    if not use_azure_openai() and not OPENAI_API_KEY:
+        print("Error: Neither Azure OpenAI credentials nor OPENAI_API_KEY are set")
         print("Please configure Azure OpenAI credentials in your .env file:")
         print("AZURE_OPENAI_KEY=your_azure_openai_key")
         print("AZURE_OPENAI_ENDPOINT=https://your-resource-name.openai.azure.com/")
@@ -317,45 +589,36 @@ def main():
     # Start timing
     start_time = time.time()
     
-    # Load the transcript
-    transcript = load_transcript(args.input)
-    if not transcript:
-        return 1
-    
-    # Format the transcript for GPT
-    formatted_transcript = format_transcript_for_gpt(transcript)
-    
     # Determine if we're using Azure OpenAI or standard OpenAI
-    api_type = "Azure OpenAI" if (AZURE_OPENAI_KEY and AZURE_OPENAI_ENDPOINT and AZURE_OPENAI_DEPLOYMENT) else "standard OpenAI"
+    api_type = "Azure OpenAI" if use_azure_openai() else "standard OpenAI"
     
-    # Improve the transcript
+    # Improve the transcripts
     print(f"Improving transcript using {api_type} with model {args.model}...")
-    improved_transcript = improve_transcript_with_gpt(
-        formatted_transcript,
-        model=args.model,
-        preserve_speakers=not args.no_preserve_speakers,
-        formality_level=args.formality
-    )
-    
-    if not improved_transcript:
-        return 1
+    improved_transcripts = asyncio.run(improve_files(args.input, args))
     
     # Calculate elapsed time
     elapsed_time = time.time() - start_time
     print(f"Transcript improvement completed in {elapsed_time:.2f} seconds")
     
-    # Save the improved transcript
-    save_improved_transcript(improved_transcript, args.output, args.input)
-    
-    # Print a preview of the improved transcript
-    preview_lines = improved_transcript.split('\n')[:5]
-    print("\nImproved transcript preview:")
-    for line in preview_lines:
-        print(line)
-    if len(preview_lines) < improved_transcript.count('\n') + 1:
-        print("...")
+    exit_code = 0
+    for input_file, improved_transcript in zip(args.input, improved_transcripts):
+        if not improved_transcript:
+            print(f"Error: Could not improve transcript: {input_file}")
+            exit_code = 1
+            continue
+        
+        # Save the improved transcript
+        save_improved_transcript(improved_transcript, args.output, input_file)
+        
+        # Print a preview of the improved transcript
+        preview_lines = improved_transcript.split('\n')[:5]
+        print("\nImproved transcript preview:")
+        for line in preview_lines:
+            print(line)
+        if len(preview_lines) < improved_transcript.count('\n') + 1:
+            print("...")
     
-    return 0
+    return exit_code
 
 if __name__ == "__main__":
     sys.exit(main())
@@ -11,14 +11,23 @@ Requirements:
 import os
 import sys
 import argparse
+import re
+import shutil
+import hashlib
+import tempfile
+import threading
+import wave
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from xml.sax.saxutils import escape
 from dotenv import load_dotenv
-import azure.cognitiveservices.speech as speechsdk
-from azure.cognitiveservices.speech import SpeechSynthesisOutputFormat
 
-# Load environment variables from .env file
+# Load environment variables from .env file, unless the shell already set
+# everything it would provide; variables already set are never overridden
+ENV_VARIABLES = ('AZURE_SPEECH_KEY', 'AZURE_SPEECH_REGION', 'AZURE_SPEAKER_PROFILE_ID')
 env_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
-if os.path.exists(env_path):
-    load_dotenv(env_path)
+if not all(os.environ.get(name) for name in ENV_VARIABLES) and os.path.isfile(env_path):
+    load_dotenv(env_path, override=False)
 
 
 # Get credentials from environment variables
@@ -27,82 +36,476 @@ SPEECH_KEY = os.environ.get('AZURE_SPEECH_KEY')
 SPEECH_REGION = os.environ.get('AZURE_SPEECH_REGION')
 AZURE_SPEAKER_PROFILE_ID = os.environ.get('AZURE_SPEAKER_PROFILE_ID',None)
 
-print("Using Azure Speech Service with the following configuration:")
-print(f"  Speech Region: {'***' if SPEECH_REGION else 'Not set'}")
-# Print speaker profile ID if available
-if AZURE_SPEAKER_PROFILE_ID:
-    print(f"  Speaker Profile ID: {'***' if AZURE_SPEAKER_PROFILE_ID else 'Not set'}")
+# Region used when AZURE_SPEECH_REGION is not set
+DEFAULT_SPEECH_REGION = "eastus"
 
-# Check if credentials are available
-if not SPEECH_KEY or not SPEECH_REGION:
-    print("Warning: Azure Speech credentials not found in environment variables.")
-    print("Please set AZURE_SPEECH_KEY and AZURE_SPEECH_REGION in your .env file.")
-    print("Using default region (eastus). You will need to provide a valid key to use the service.")
-    if not SPEECH_REGION:
-        SPEECH_REGION = "eastus"
+# Maximum number of syntheses run at once, within the service's concurrency limits
+MAX_CONCURRENT_SYNTHESES = 4
 
-def text_to_speech_basic(text, output_filename="output.wav", voice_name="en-US-JennyNeural"):
+# Personal voice variants rendered with --variants: (output file, rate, reduce pauses)
+VARIANTS = [
+    ("audio/personal_voice_output.wav", "1.0", False),
+    ("audio/personal_voice_faster.wav", "1.2", False),  # 20% faster
+    ("audio/personal_voice_fewer_pauses.wav", "1.0", True),
+    ("audio/personal_voice_faster_fewer_pauses.wav", "1.2", True),
+]
+
+# Punctuation followed by a space, and the minimal-pause break used with --reduce-pauses
+PAUSE_PATTERN = re.compile(r'([.?!,]) ')
+PAUSE_BREAKS = {
+    '.': '.<break strength="weak"/> ',
+    '?': '?<break strength="weak"/> ',
+    '!': '!<break strength="weak"/> ',
+    ',': ',<break strength="none"/> ',
+}
+
+# SSML for personal voice synthesis, without insignificant whitespace, split
+# around the speaker profile ID, rate and text that are joined in between
+PERSONAL_VOICE_SSML_PREFIX = (
+    "<speak version='1.0' xmlns='http://www.w3.org/2001/10/synthesis' "
+    "xmlns:mstts='http://www.w3.org/2001/mstts' xml:lang='en-US'>"
+    "<voice name='DragonLatestNeural'>"
+    "<mstts:ttsembedding speakerProfileId='"
+)
+PERSONAL_VOICE_SSML_RATE = "'><prosody rate='"
+PERSONAL_VOICE_SSML_TEXT = "'>"
+PERSONAL_VOICE_SSML_SUFFIX = "</prosody></mstts:ttsembedding></voice></speak>"
+
+# Long input is split at sentence ends into chunks of at most this many
+# characters, which are synthesized in parallel and joined into one file
+MAX_CHUNK_CHARS = 800
+SENTENCE_END = re.compile(r'(?<=[.?!])\s+')
+
+# Output formats selectable with --format, as SpeechSynthesisOutputFormat names
+# (the SDK is imported on first use); None keeps the SDK's default 16kHz PCM WAV.
+# MP3 is far smaller on the wire and on disk
+OUTPUT_FORMATS = {
+    'wav': None,
+    'mp3': 'Audio48Khz96KBitRateMonoMp3',
+}
+
+# Formats for chunks that are joined before saving: raw PCM, so one WAV header
+# can be written for the whole file, or MP3, whose frames can be concatenated
+CHUNK_OUTPUT_FORMATS = {
+    'wav': 'Raw16Khz16BitMonoPcm',
+    'mp3': 'Audio48Khz96KBitRateMonoMp3',
+}
+CHUNK_SAMPLE_RATE = 16000
+READ_BUFFER_SIZE = 32000
+
+# Input files larger than this are fed to the service while they are read,
+# in pieces of TEXT_READ_SIZE characters, instead of being loaded first
+STREAM_INPUT_THRESHOLD = 64 * 1024
+TEXT_READ_SIZE = 4096
+
+# Synthesized audio is cached here when TTS_CACHE=1, keyed by the synthesis input
+AUDIO_CACHE_DIR = os.path.join('audio', '.cache')
+
+# Idle synthesizers keyed by (voice name, output format); the voice name is None
+# for SSML, where the voice is in the markup. Reusing them keeps the service
+# connection open between calls
+SYNTHESIZER_POOL = {}
+SYNTHESIZER_POOL_LOCK = threading.Lock()
+
+# Held for the duration of each synthesis to enforce MAX_CONCURRENT_SYNTHESES,
+# even when variants and their chunks are rendered by separate thread pools
+SYNTHESIS_SLOTS = threading.BoundedSemaphore(MAX_CONCURRENT_SYNTHESES)
+
+def check_credentials():
     """
-    Convert text to speech using a standard voice
+    Print the Speech Service configuration and warn about missing credentials
     """
-    # Configure speech synthesis
-    speech_config = speechsdk.SpeechConfig(subscription=SPEECH_KEY, region=SPEECH_REGION)
+    print("Using Azure Speech Service with the following configuration:")
+    print(f"  Speech Region: {'***' if SPEECH_REGION else 'Not set'}")
+    # Print speaker profile ID if available
+    if AZURE_SPEAKER_PROFILE_ID:
+        print(f"  Speaker Profile ID: {'***' if AZURE_SPEAKER_PROFILE_ID else 'Not set'}")
+
+    # Check if credentials are available
+    if not SPEECH_KEY or not SPEECH_REGION:
+        print("Warning: Azure Speech credentials not found in environment variables.")
+        print("Please set AZURE_SPEECH_KEY and AZURE_SPEECH_REGION in your .env file.")
+        print(f"Using default region ({DEFAULT_SPEECH_REGION}). You will need to provide a valid key to use the service.")
+
+@contextmanager
+def pooled_synthesizer(voice_name=None, output_format=None):
+    """
+    Borrow a speech synthesizer from the pool, creating one if none is idle
     
-    # Set the voice name
-    speech_config.speech_synthesis_voice_name = voice_name
+    Args:
+        voice_name (str): Voice for plain text synthesis, or None for SSML
+        output_format (str): SpeechSynthesisOutputFormat name, or None for the default WAV
+        
+    Yields:
+        speechsdk.SpeechSynthesizer: A synthesizer used by no other caller
+    """
+    import azure.cognitiveservices.speech as speechsdk
     
-    # Configure audio output
-    audio_config = speechsdk.audio.AudioOutputConfig(filename=output_filename)
+    # Every synthesis borrows a synthesizer here, so holding a slot while it is
+    # borrowed caps concurrent syntheses across all thread pools
+    with SYNTHESIS_SLOTS:
+        key = (voice_name, output_format)
+        with SYNTHESIZER_POOL_LOCK:
+            idle = SYNTHESIZER_POOL.setdefault(key, [])
+            synthesizer = idle.pop() if idle else None
+        
+        if synthesizer is None:
+            # Configure speech synthesis
+            speech_config = speechsdk.SpeechConfig(subscription=SPEECH_KEY,
+                                                   region=SPEECH_REGION or DEFAULT_SPEECH_REGION)
+            if voice_name:
+                speech_config.speech_synthesis_voice_name = voice_name
+            if output_format is not None:
+                speech_config.set_speech_synthesis_output_format(
+                    getattr(speechsdk.SpeechSynthesisOutputFormat, output_format))
+        
+            # Audio is read from the result stream rather than written by the SDK,
+            # so no audio output is configured and the synthesizer can serve any file
+            synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=None)
+        
+        try:
+            yield synthesizer
+        finally:
+            with SYNTHESIZER_POOL_LOCK:
+                SYNTHESIZER_POOL[key].append(synthesizer)
+
+def save_synthesis(result, output_filename, audio_format="wav"):
+    """
+    Stream synthesized audio into a file as it is produced
     
-    # Create speech synthesizer
-    synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=audio_config)
+    Args:
+        result (speechsdk.SpeechSynthesisResult): Result of a start_speaking_* call
+        output_filename (str): The filename to save the audio to
+        audio_format (str): Key of OUTPUT_FORMATS the synthesizer was created with
+        
+    Returns:
+        bool: True if the audio was synthesized and saved
+    """
+    import azure.cognitiveservices.speech as speechsdk
+    
+    if result.reason == speechsdk.ResultReason.Canceled:
+        print_cancellation(result.cancellation_details)
+        return False
     
-    # Synthesize speech
-    result = synthesizer.speak_text_async(text).get()
+    # The stream is written to disk while the service is still synthesizing
+    stream = speechsdk.AudioDataStream(result)
+    if audio_format == "wav":
+        stream.save_to_wav_file_async(output_filename).get()
+    else:
+        with open(output_filename, 'wb') as f:
+            for data in read_stream(stream):
+                f.write(data)
+    if stream.status == speechsdk.StreamStatus.Canceled:
+        print_cancellation(stream.cancellation_details)
+        return False
+    return True
+
+def read_stream(stream):
+    """
+    Read audio from a synthesis stream as it is produced
+    
+    Args:
+        stream (speechsdk.AudioDataStream): The stream to read
+        
+    Yields:
+        bytes: Audio data in the synthesizer's output format
+    """
+    buffer = bytes(READ_BUFFER_SIZE)
+    filled = stream.read_data(buffer)
+    while filled > 0:
+        yield buffer[:filled]
+        filled = stream.read_data(buffer)
+
+def print_cancellation(cancellation_details):
+    """
+    Report why speech synthesis was canceled
+    """
+    import azure.cognitiveservices.speech as speechsdk
+    
+    print(f"Speech synthesis canceled: {cancellation_details.reason}")
+    if cancellation_details.reason == speechsdk.CancellationReason.Error:
+        print(f"Error details: {cancellation_details.error_details}")
+
+def get_audio_cache_key(*parts):
+    """
+    Build the audio cache key for a synthesis request
+    
+    Args:
+        *parts (str): Everything that affects the audio (voice, text or SSML, ...)
+        
+    Returns:
+        str: Hex digest of the parts, or None if the cache is disabled
+    """
+    if os.environ.get('TTS_CACHE') != '1':
+        return None
+    return hashlib.blake2b("\0".join(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+def load_cached_audio(cache_key, output_filename, audio_format="wav"):
+    """Copy cached audio to output_filename; returns False on a miss"""
+    if not cache_key:
+        return False
+    cached_file = os.path.join(AUDIO_CACHE_DIR, f"{cache_key}.{audio_format}")
+    try:
+        shutil.copyfile(cached_file, output_filename)
+    except FileNotFoundError:
+        return False
+    print(f"Using cached audio for [{output_filename}]")
+    return True
+
+def store_cached_audio(cache_key, output_filename, audio_format="wav"):
+    """Atomically add a synthesized file to the cache; failures are only reported"""
+    if not cache_key:
+        return
+    temp_path = None
+    try:
+        os.makedirs(AUDIO_CACHE_DIR, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=AUDIO_CACHE_DIR, suffix='.tmp', delete=False) as f:
+            temp_path = f.name
+        shutil.copyfile(output_filename, temp_path)
+        os.replace(temp_path, os.path.join(AUDIO_CACHE_DIR, f"{cache_key}.{audio_format}"))
+    except OSError as e:
+        print(f"Warning: Could not write audio cache: {e}")
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def split_into_chunks(text, max_chars=MAX_CHUNK_CHARS):
+    """
+    Split text at sentence boundaries into chunks of at most max_chars characters
+    
+    Args:
+        text (str): The text to split
+        max_chars (int): Maximum characters per chunk; a longer sentence
+            becomes a chunk of its own
+        
+    Returns:
+        list: Chunks in text order
+    """
+    if len(text) <= max_chars:
+        return [text]
+    
+    chunks = []
+    current_chunk = []
+    current_length = 0
+    for sentence in SENTENCE_END.split(text.strip()):
+        if current_chunk and current_length + len(sentence) > max_chars:
+            chunks.append(" ".join(current_chunk))
+            current_chunk = []
+            current_length = 0
+        current_chunk.append(sentence)
+        current_length += len(sentence) + 1
+    if current_chunk:
+        chunks.append(" ".join(current_chunk))
+    return chunks
+
+def synthesize_chunk(content, voice_name=None, ssml=False, audio_format="wav"):
+    """
+    Synthesize one chunk into memory
+    
+    Args:
+        content (str): Text, or SSML if ssml is set
+        voice_name (str): Voice for plain text synthesis
+        ssml (bool): Whether content is SSML
+        audio_format (str): Key of CHUNK_OUTPUT_FORMATS to synthesize
+        
+    Returns:
+        bytes: Raw 16-bit PCM, 16kHz, mono audio (or MP3 frames), or None if synthesis failed
+    """
+    import azure.cognitiveservices.speech as speechsdk
+    
+    with pooled_synthesizer(None if ssml else voice_name, CHUNK_OUTPUT_FORMATS[audio_format]) as synthesizer:
+        if ssml:
+            result = synthesizer.start_speaking_ssml_async(content).get()
+        else:
+            result = synthesizer.start_speaking_text_async(content).get()
+        if result.reason == speechsdk.ResultReason.Canceled:
+            print_cancellation(result.cancellation_details)
+            return None
+        
+        # Read the audio as it is produced
+        stream = speechsdk.AudioDataStream(result)
+        audio = b"".join(read_stream(stream))
+        
+        if stream.status == speechsdk.StreamStatus.Canceled:
+            print_cancellation(stream.cancellation_details)
+            return None
+        return audio
+
+def synthesize_chunks(contents, output_filename, voice_name=None, ssml=False, audio_format="wav"):
+    """
+    Synthesize chunks in parallel and save them as a single audio file
+    
+    Args:
+        contents (list): Texts, or SSML documents if ssml is set, in playback order
+        output_filename (str): The filename to save the audio to
+        voice_name (str): Voice for plain text synthesis
+        ssml (bool): Whether contents are SSML
+        audio_format (str): "wav" or "mp3"
+        
+    Returns:
+        bool: True if every chunk was synthesized and the file saved
+    """
+    print(f"Synthesizing {len(contents)} chunks in parallel...")
+    # Write to a temporary file next to the output and move it into place once
+    # every chunk is in, so a failure never leaves truncated audio behind. It is
+    # created with a plain open, so it gets the same permissions as audio the
+    # SDK writes directly
+    temp_path = output_filename + '.tmp'
+    success = False
+    try:
+        if audio_format == "wav":
+            output = wave.open(temp_path, 'wb')
+            output.setparams((1, 2, CHUNK_SAMPLE_RATE, 0, 'NONE', 'not compressed'))
+            write = output.writeframes
+        else:
+            output = open(temp_path, 'wb')
+            write = output.write
+        
+        # Write each chunk as soon as it and the chunks before it are done, so
+        # finished audio is not held in memory until the last chunk completes
+        try:
+            complete = True
+            with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_SYNTHESES) as executor:
+                futures = [executor.submit(synthesize_chunk, content, voice_name=voice_name, ssml=ssml,
+                                           audio_format=audio_format)
+                           for content in contents]
+                try:
+                    for future in futures:
+                        audio = future.result()
+                        if audio is None:
+                            complete = False
+                            break
+                        write(audio)
+                finally:
+                    # After a failure, don't spend synthesis calls on chunks
+                    # whose audio would be thrown away
+                    for future in futures:
+                        future.cancel()
+        finally:
+            output.close()
+        
+        if complete:
+            os.replace(temp_path, output_filename)
+            success = True
+    finally:
+        if not success and os.path.exists(temp_path):
+            os.remove(temp_path)
+    return success
+
+def text_to_speech_basic(text, output_filename="output.wav", voice_name="en-US-JennyNeural", audio_format="wav"):
+    """
+    Convert text to speech using a standard voice
+    """
+    # Reuse audio from an earlier run with the same voice and text
+    cache_key = get_audio_cache_key("text", audio_format, voice_name, text)
+    if load_cached_audio(cache_key, output_filename, audio_format):
+        return True
+    
+    chunks = split_into_chunks(text)
+    if len(chunks) > 1:
+        # Long text: synthesize sentence chunks in parallel
+        success = synthesize_chunks(chunks, output_filename, voice_name=voice_name, audio_format=audio_format)
+    else:
+        # Synthesize speech, returning as soon as the first audio arrives
+        with pooled_synthesizer(voice_name, OUTPUT_FORMATS[audio_format]) as synthesizer:
+            result = synthesizer.start_speaking_text_async(text).get()
+            success = save_synthesis(result, output_filename, audio_format)
     
     # Check result
-    if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
+    if success:
+        store_cached_audio(cache_key, output_filename, audio_format)
         print(f"Speech synthesized for text [{text}] and saved to [{output_filename}]")
         return True
-    elif result.reason == speechsdk.ResultReason.Canceled:
-        cancellation_details = result.cancellation_details
-        print(f"Speech synthesis canceled: {cancellation_details.reason}")
-        if cancellation_details.reason == speechsdk.CancellationReason.Error:
-            print(f"Error details: {cancellation_details.error_details}")
-        return False
     return False
 
-def text_to_speech_with_ssml(ssml, output_filename="output.wav"):
+def text_to_speech_stream_input(file_path, output_filename="output.wav", voice_name="en-US-JennyNeural",
+                                audio_format="wav"):
     """
-    Convert text to speech using SSML (Speech Synthesis Markup Language)
-    Allows for more control over speech synthesis including using personal voice via speakerProfileId
+    Convert a text file to speech, streaming the text to the service as it is read
+    
+    Args:
+        file_path (str): Path to the text file
+        output_filename (str): The filename to save the audio to
+        voice_name (str): The standard voice to use; personal voice does not support text streaming
+        audio_format (str): Output audio format, "wav" or "mp3"
+        
+    Returns:
+        bool: True if the audio was synthesized and saved
     """
-    # Configure speech synthesis
-    speech_config = speechsdk.SpeechConfig(subscription=SPEECH_KEY, region=SPEECH_REGION)
+    import azure.cognitiveservices.speech as speechsdk
     
-    # Configure audio output
-    audio_config = speechsdk.audio.AudioOutputConfig(filename=output_filename)
+    # Text streaming is only served by the v2 websocket endpoint
+    region = SPEECH_REGION or DEFAULT_SPEECH_REGION
+    speech_config = speechsdk.SpeechConfig(
+        endpoint=f"wss://{region}.tts.speech.microsoft.com/cognitiveservices/websocket/v2",
+        subscription=SPEECH_KEY)
+    speech_config.speech_synthesis_voice_name = voice_name
+    if OUTPUT_FORMATS[audio_format] is not None:
+        speech_config.set_speech_synthesis_output_format(
+            getattr(speechsdk.SpeechSynthesisOutputFormat, OUTPUT_FORMATS[audio_format]))
     
-    # Create speech synthesizer
+    # The SDK writes audio to the file as it arrives
+    audio_config = speechsdk.audio.AudioOutputConfig(filename=output_filename)
     synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=audio_config)
     
-    # Synthesize speech from SSML
-    result = synthesizer.speak_ssml_async(ssml).get()
+    request = speechsdk.SpeechSynthesisRequest(
+        input_type=speechsdk.SpeechSynthesisRequestInputType.TextStream)
+    success = False
+    try:
+        with SYNTHESIS_SLOTS:
+            task = synthesizer.speak_async(request)
+            read_ok = True
+            try:
+                # Decode the same way as read_sample_text, so a file is accepted
+                # whichever side of STREAM_INPUT_THRESHOLD it falls on
+                with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
+                    for text in iter(lambda: file.read(TEXT_READ_SIZE), ''):
+                        request.input_stream.write(text)
+            except Exception as e:
+                print(f"Error reading file {file_path}: {e}")
+                read_ok = False
+            finally:
+                # Closing the input stream ends the synthesis
+                request.input_stream.close()
+            result = task.get()
+        
+        if result.reason == speechsdk.ResultReason.Canceled:
+            print_cancellation(result.cancellation_details)
+        success = read_ok and result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted
+    finally:
+        if not success:
+            # Release the SDK's handle on the output, then remove the partial audio
+            del synthesizer
+            if os.path.exists(output_filename):
+                os.remove(output_filename)
+    
+    if success:
+        print(f"Speech synthesized for {file_path} and saved to {output_filename}")
+    return success
+
+def text_to_speech_with_ssml(ssml, output_filename="output.wav", audio_format="wav"):
+    """
+    Convert text to speech using SSML (Speech Synthesis Markup Language)
+    Allows for more control over speech synthesis including using personal voice via speakerProfileId
+    """
+    # Reuse audio from an earlier run with the same SSML
+    cache_key = get_audio_cache_key("ssml", audio_format, ssml)
+    if load_cached_audio(cache_key, output_filename, audio_format):
+        return True
+    
+    # Synthesize speech from SSML, returning as soon as the first audio arrives
+    with pooled_synthesizer(None, OUTPUT_FORMATS[audio_format]) as synthesizer:
+        result = synthesizer.start_speaking_ssml_async(ssml).get()
+        success = save_synthesis(result, output_filename, audio_format)
     
     # Check result
-    if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
+    if success:
+        store_cached_audio(cache_key, output_filename, audio_format)
         print(f"Speech synthesized from SSML and saved to [{output_filename}]")
         return True
-    elif result.reason == speechsdk.ResultReason.Canceled:
-        cancellation_details = result.cancellation_details
-        print(f"Speech synthesis canceled: {cancellation_details.reason}")
-        if cancellation_details.reason == speechsdk.CancellationReason.Error:
-            print(f"Error details: {cancellation_details.error_details}")
-        return False
     return False
 
 def personal_voice_text_to_speech(text, speaker_profile_id, output_filename="personal_voice_output.wav", 
-                          rate="1.0", reduce_pauses=False):
+                          rate="1.0", reduce_pauses=False, audio_format="wav"):
     """
     Convert text to speech using a personal voice
     
@@ -112,46 +515,68 @@ def personal_voice_text_to_speech(text, speaker_profile_id, output_filename="per
         output_filename (str): The filename to save the audio to
         rate (str): The speaking rate (e.g., "1.0", "1.2", "fast")
         reduce_pauses (bool): Whether to minimize pauses between sentences/phrases
+        audio_format (str): Output audio format, "wav" or "mp3"
     """
+    # Long text is split into sentence chunks, each sent as its own SSML request
+    ssml_chunks = [build_personal_voice_ssml(chunk, speaker_profile_id, rate, reduce_pauses)
+                   for chunk in split_into_chunks(text)]
+    if len(ssml_chunks) > 1:
+        cache_key = get_audio_cache_key("ssml", audio_format, *ssml_chunks)
+        if load_cached_audio(cache_key, output_filename, audio_format):
+            return True
+        if synthesize_chunks(ssml_chunks, output_filename, ssml=True, audio_format=audio_format):
+            store_cached_audio(cache_key, output_filename, audio_format)
+            print(f"Speech synthesized from SSML and saved to [{output_filename}]")
+            return True
+        return False
+    
+    return text_to_speech_with_ssml(ssml_chunks[0], output_filename, audio_format)
+
+def build_personal_voice_ssml(text, speaker_profile_id, rate="1.0", reduce_pauses=False):
+    """
+    Build the SSML for speaking text with a personal voice
+    
+    Args:
+        text (str): The text to speak
+        speaker_profile_id (str): The speaker profile ID for the personal voice
+        rate (str): The speaking rate (e.g., "1.0", "1.2", "fast")
+        reduce_pauses (bool): Whether to minimize pauses between sentences/phrases
+        
+    Returns:
+        str: The SSML document
+    """
+    # Escape the text so characters like & and < can't break the SSML
+    text = escape(text)
+    
     # Process text to reduce pauses if requested
     if reduce_pauses:
-        # Replace periods and other punctuation that might cause longer pauses
-        # with break tags that have minimal pause
-        text = text.replace(". ", '.<break strength="weak"/> ')
-        text = text.replace("? ", '?<break strength="weak"/> ')
-        text = text.replace("! ", '!<break strength="weak"/> ')
-        text = text.replace(", ", ',<break strength="none"/> ')
+        # Follow punctuation that might cause longer pauses with break tags
+        # that have minimal pause, in a single pass over the text
+        text = PAUSE_PATTERN.sub(lambda match: PAUSE_BREAKS[match.group(1)], text)
     
     # Create SSML with speaker profile ID for personal voice
-    ssml = f"""
-    <speak version='1.0' xmlns='http://www.w3.org/2001/10/synthesis' xmlns:mstts='http://www.w3.org/2001/mstts' xml:lang='en-US'>
-        <voice name='DragonLatestNeural'> 
-            <mstts:ttsembedding speakerProfileId='{speaker_profile_id}'>
-                <prosody rate="{rate}">
-                    {text}
-                </prosody>
-            </mstts:ttsembedding> 
-        </voice> 
-    </speak>
-    """
-    
-    return text_to_speech_with_ssml(ssml, output_filename)
+    return "".join((PERSONAL_VOICE_SSML_PREFIX, speaker_profile_id, PERSONAL_VOICE_SSML_RATE, rate,
+                    PERSONAL_VOICE_SSML_TEXT, text, PERSONAL_VOICE_SSML_SUFFIX))
 
 def read_sample_text(file_path):
     """
     Read sample text from a file
     """
     try:
-        with open(file_path, 'r') as file:
-            return file.read()
+        # Decode once rather than through a text-mode wrapper; newlines are
+        # left as-is since they are whitespace to the synthesizer
+        with open(file_path, 'rb') as file:
+            return file.read().decode('utf-8', errors='replace')
     except Exception as e:
         print(f"Error reading file {file_path}: {e}")
         return None
 
+def with_format(output_filename, audio_format):
+    """Swap the extension of output_filename to match the audio format"""
+    return os.path.splitext(output_filename)[0] + "." + audio_format
+
 if __name__ == "__main__":
     # Add command-line argument parsing
-    import argparse
-    
     parser = argparse.ArgumentParser(description="Convert text to speech using Azure AI Speech Service")
     parser.add_argument("--input", help="Path to text file to convert to speech (optional)")
     parser.add_argument("--output", default="audio/personal_output.wav", help="Path to save the audio output (default: output.wav)")
@@ -160,12 +585,26 @@ if __name__ == "__main__":
     parser.add_argument("--rate", default="1.0", help="Speaking rate (default: 1.0)")
     parser.add_argument("--reduce-pauses", action="store_true", help="Reduce pauses between sentences")
     parser.add_argument("--variants", action="store_true", help="Use variants for personal voice synthesis (optional)")
+    parser.add_argument("--format", choices=sorted(OUTPUT_FORMATS), default="wav",
+                        help="Audio format of the output files (default: wav; mp3 is much smaller)")
 
     args = parser.parse_args()
+    check_credentials()
+    
+    # Create the output directories up front so the first synthesis can write to them
+    os.makedirs("audio", exist_ok=True)
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    
+    personal_voice_id = args.personal_voice if args.personal_voice else AZURE_SPEAKER_PROFILE_ID
+    # Large input files for the standard voice are streamed to the service as they are read
+    stream_input = (not personal_voice_id and args.input and os.path.isfile(args.input)
+                    and os.path.getsize(args.input) > STREAM_INPUT_THRESHOLD)
     
     # Read from input file if provided, otherwise use sample text
     text_to_convert = None
-    if args.input:
+    if stream_input:
+        print(f"Streaming input file: {args.input}")
+    elif args.input:
         text_to_convert = read_sample_text(args.input)
         if not text_to_convert:
             print(f"Error reading input file: {args.input}")
@@ -177,7 +616,6 @@ if __name__ == "__main__":
         print(f"Using sample text: {text_to_convert[:50]}...")  # Print first 50 characters for brevity
 
 
-    personal_voice_id = args.personal_voice if args.personal_voice else AZURE_SPEAKER_PROFILE_ID
     # If personal voice ID is provided, use it for synthesis
     if personal_voice_id:
         print(f"Using personal voice with ID: {personal_voice_id}")
@@ -187,9 +625,10 @@ if __name__ == "__main__":
             personal_voice_text_to_speech(
                 text_to_convert, 
                 personal_voice_id, 
-                args.output,
+                with_format(args.output, args.format),
                 rate=args.rate,
-                reduce_pauses=args.reduce_pauses
+                reduce_pauses=args.reduce_pauses,
+                audio_format=args.format
             )
         else:
             # Use personal voice with variants
@@ -201,35 +640,34 @@ if __name__ == "__main__":
             # https://learn.microsoft.com/en-us/azure/ai-services/speech-service/personal-voice-create-voice
             
                        
-            # Option 1: Standard personal voice synthesis
-            personal_voice_text_to_speech(text_to_convert, 
-                                            personal_voice_id, 
-                                            "audio/personal_voice_output.wav")
-            
-            # Option 2: Faster speech rate (20% faster)
-            personal_voice_text_to_speech(text_to_convert,
-                                            personal_voice_id,
-                                            "audio/personal_voice_faster.wav",
-                                            rate="1.2")
-                                            
-            # Option 3: Reduced pauses between sentences
-            personal_voice_text_to_speech(text_to_convert,
-                                            personal_voice_id,
-                                            "audio/personal_voice_fewer_pauses.wav",
-                                            reduce_pauses=True)
-                                            
-            # Option 4: Both faster and reduced pauses
-            personal_voice_text_to_speech(text_to_convert,
-                                            personal_voice_id,
-                                            "audio/personal_voice_faster_fewer_pauses.wav",
-                                            rate="1.2",
-                                            reduce_pauses=True)
+            # The variants are independent, so render them concurrently; each
+            # worker borrows its own synthesizer from the pool
+            with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_SYNTHESES) as executor:
+                futures = [executor.submit(personal_voice_text_to_speech,
+                                           text_to_convert,
+                                           personal_voice_id,
+                                           with_format(output_filename, args.format),
+                                           rate=rate,
+                                           reduce_pauses=reduce_pauses,
+                                           audio_format=args.format)
+                           for output_filename, rate, reduce_pauses in VARIANTS]
+                
+                # Surface any exception raised while rendering
+                for future in futures:
+                    future.result()
     else:
         print("No personal voice ID provided. Using standard voice synthesis.")
         # Example 1: Basic text-to-speech with standard voice
-        text_to_speech_basic(text_to_convert, 
-                             output_filename="audio/standard_voice_output.wav",
-                             voice_name=args.voice)
+        if stream_input:
+            text_to_speech_stream_input(args.input,
+                                        with_format("audio/standard_voice_output.wav", args.format),
+                                        voice_name=args.voice,
+                                        audio_format=args.format)
+        else:
+            text_to_speech_basic(text_to_convert, 
+                                 output_filename=with_format("audio/standard_voice_output.wav", args.format),
+                                 voice_name=args.voice,
+                                 audio_format=args.format)
 
      
 